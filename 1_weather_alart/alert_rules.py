@@ -0,0 +1,160 @@
+import time
+import warnings
+from dataclasses import dataclass
+
+import numpy as np
+
+FIELDS = ("temp", "feels_like", "humidity", "pop", "precip", "wind_speed", "wind_gust")
+FIELD_INDEX = {field: i for i, field in enumerate(FIELDS)}
+HORIZON_HOURS = 24
+
+# Clothing by temperature (°C): below 5, below 15, below 25, 25 and up
+CLOTHING_BINS = np.array([5, 15, 25])
+CLOTHING = np.array([
+    "🧥 It's essential to wear a coat!",
+    "🧥 Wear a thick coat",
+    "👕 Wear a moderate outfit",
+    "👕 Wear light clothing",
+])
+
+REDUCERS = ("max", "min", "sum", "mean")
+OPERATORS = (">", ">=", "<", "<=")
+
+
+@dataclass(frozen=True)
+class Rule:
+    """
+    Declarative forecast rule: reduce `field` over a window, compare it with `threshold`.
+
+    The window is `within_hours` from now, optionally narrowed to local
+    hours of the day (`local_hours`, a tuple of (start, end) ranges).
+    `message` is formatted with the reduced value as {value}.
+    """
+    name: str
+    field: str
+    reduce: str
+    op: str
+    threshold: float
+    message: str
+    within_hours: int = 12
+    local_hours: tuple = ()
+
+
+DEFAULT_RULES = (
+    Rule("umbrella", "pop", "max", ">=", 0.4,
+         "☔ Don't forget to bring an umbrella! (up to {value:.0%} chance of rain in the next 12 h)"),
+    Rule("rain", "precip", "sum", ">", 2.0,
+         "🌧️ About {value:.0f} mm of rain expected in the next 12 h"),
+    Rule("cold_commute", "feels_like", "min", "<", 0.0,
+         "🥶 Feels like {value:.0f}°C during commute hours", within_hours=24, local_hours=((7, 10), (17, 20))),
+    Rule("heat", "temp", "max", ">=", 33.0,
+         "🥵 Up to {value:.0f}°C today, stay hydrated", within_hours=24),
+    Rule("gusts", "wind_gust", "max", ">=", 14.0,
+         "💨 Wind gusts up to {value:.0f} m/s in the next 12 h"),
+)
+
+
+@dataclass
+class ForecastBatch:
+    """Forecast values for C cities over H time steps, NaN where a city has no data."""
+    cities: list
+    times: np.ndarray        # (C, H) unix seconds
+    local_hours: np.ndarray  # (C, H) hour of day in each city's timezone
+    values: np.ndarray       # (F, C, H), fields in FIELDS order
+
+
+def forecast_batch(cities, forecasts, horizon_hours=HORIZON_HOURS, now=None):
+    """
+    Stack OpenWeatherMap /forecast responses (3-hourly, one per city, None if
+    missing) into arrays covering the next `horizon_hours`.
+    """
+    now = now or time.time()
+    steps = []
+    for forecast in forecasts:
+        items = [item for item in (forecast or {}).get("list", []) if now - 3 * 3600 < item["dt"] <= now + horizon_hours * 3600]
+        steps.append(items)
+
+    width = max((len(items) for items in steps), default=0)
+    shape = (len(cities), width)
+    times = np.full(shape, np.nan)
+    local_hours = np.full(shape, np.nan)
+    values = np.full((len(FIELDS),) + shape, np.nan)
+
+    for c, (forecast, items) in enumerate(zip(forecasts, steps)):
+        offset = (forecast or {}).get("city", {}).get("timezone", 0)
+        for h, item in enumerate(items):
+            times[c, h] = item["dt"]
+            local_hours[c, h] = ((item["dt"] + offset) // 3600) % 24
+            main = item.get("main", {})
+            wind = item.get("wind", {})
+            values[:, c, h] = (
+                main.get("temp", np.nan),
+                main.get("feels_like", np.nan),
+                main.get("humidity", np.nan),
+                item.get("pop", 0.0),
+                item.get("rain", {}).get("3h", 0.0) + item.get("snow", {}).get("3h", 0.0),
+                wind.get("speed", np.nan),
+                wind.get("gust", wind.get("speed", np.nan)),
+            )
+
+    return ForecastBatch(list(cities), times, local_hours, values)
+
+
+def evaluate(batch, rules=DEFAULT_RULES, now=None):
+    """
+    Evaluate every rule for every city in one pass.
+    Returns (triggered, reduced): (R, C) bool and float arrays.
+    """
+    now = now or time.time()
+    rules = list(rules)
+    R = len(rules)
+    if batch.times.shape[1] == 0:
+        return np.zeros((R, len(batch.cities)), dtype=bool), np.full((R, len(batch.cities)), np.nan)
+
+    # (R, C, H) window masks: time horizon, then optional local-hour ranges
+    horizon = np.array([rule.within_hours * 3600 for rule in rules], dtype=float)[:, None, None]
+    mask = (batch.times[None] <= now + horizon) & ~np.isnan(batch.times[None])
+    for r, rule in enumerate(rules):
+        if rule.local_hours:
+            in_hours = np.zeros(batch.local_hours.shape, dtype=bool)
+            for start, end in rule.local_hours:
+                in_hours |= (batch.local_hours >= start) & (batch.local_hours < end)
+            mask[r] &= in_hours
+
+    field_ids = np.array([FIELD_INDEX[rule.field] for rule in rules], dtype=int)
+    selected = np.where(mask, batch.values[field_ids], np.nan)  # (R, C, H)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN windows reduce to NaN
+        reductions = np.stack([
+            np.nanmax(selected, axis=2),
+            np.nanmin(selected, axis=2),
+            np.where(np.isnan(selected).all(axis=2), np.nan, np.nansum(selected, axis=2)),
+            np.nanmean(selected, axis=2),
+        ])  # (4, R, C)
+
+    reducer_ids = np.array([REDUCERS.index(rule.reduce) for rule in rules], dtype=int)
+    reduced = reductions[reducer_ids, np.arange(R)]  # (R, C)
+
+    thresholds = np.array([rule.threshold for rule in rules], dtype=float)[:, None]
+    with np.errstate(invalid="ignore"):
+        comparisons = np.stack([reduced > thresholds, reduced >= thresholds,
+                                reduced < thresholds, reduced <= thresholds])  # (4, R, C)
+    operator_ids = np.array([OPERATORS.index(rule.op) for rule in rules], dtype=int)
+    triggered = comparisons[operator_ids, np.arange(R)] & ~np.isnan(reduced)
+    return triggered, reduced
+
+
+def alert_lines(batch, rules=DEFAULT_RULES, now=None):
+    """{city: [message, ...]} for every rule that triggered."""
+    rules = list(rules)
+    triggered, reduced = evaluate(batch, rules, now)
+    lines = {city: [] for city in batch.cities}
+    for r, c in zip(*np.nonzero(triggered)):
+        lines[batch.cities[c]].append(rules[r].message.format(value=reduced[r, c]))
+    return lines
+
+
+def clothing_for(temps):
+    """Clothing recommendation for each temperature (°C)."""
+    return CLOTHING[np.digitize(np.asarray(temps, dtype=float), CLOTHING_BINS)]
@@ -0,0 +1,131 @@
+import asyncio
+import csv
+import heapq
+import itertools
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+SUBSCRIPTIONS_FILE = "subscriptions.csv"  # columns: subscriber, city, time, timezone
+DEFAULT_ALERT_TIME = "09:00"
+COALESCE_WINDOW = 60  # seconds; alerts due this close together share one fetch per city
+
+
+@dataclass(frozen=True)
+class Subscription:
+    subscriber: str
+    city: str
+    time: str = DEFAULT_ALERT_TIME   # local wall-clock time, "HH:MM"
+    timezone: str = ""               # IANA name, e.g. "Asia/Seoul"; empty = server local time
+
+
+def load_subscriptions(filename=SUBSCRIPTIONS_FILE):
+    """Subscriptions from a CSV file (empty list if there is none)."""
+    if not os.path.exists(filename):
+        return []
+    with open(filename, "r", encoding="utf-8", newline="") as f:
+        return [
+            Subscription(
+                subscriber=row.get("subscriber", "").strip(),
+                city=row["city"].strip(),
+                time=(row.get("time") or DEFAULT_ALERT_TIME).strip(),
+                timezone=(row.get("timezone") or "").strip(),
+            )
+            for row in csv.DictReader(f)
+            if row.get("city", "").strip()
+        ]
+
+
+def next_fire_time(subscription, after):
+    """First moment strictly after `after` (an aware datetime) when the subscriber's local clock shows their alert time."""
+    zone = ZoneInfo(subscription.timezone) if subscription.timezone else None
+    hour, minute = (int(part) for part in subscription.time.split(":"))
+
+    # Work in naive local wall-clock time, so a DST change keeps the alert at the same local time
+    local = after.astimezone(zone).replace(tzinfo=None)
+    candidate = local.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if candidate <= local:
+        candidate += timedelta(days=1)
+    # Naive times convert with the server's own timezone rules
+    return candidate.replace(tzinfo=zone) if zone else candidate.astimezone()
+
+
+class AlertScheduler:
+    """
+    Fires weather alerts at each subscriber's local alert time.
+
+    Every subscription sits in a min-heap keyed by its next fire time, and
+    the loop sleeps exactly until the earliest one is due. Alerts due within
+    `coalesce_window` of each other are handled as one batch, so each city in
+    the batch is fetched once no matter how many subscribers share it.
+
+    `fetch_many(cities)` returns one weather dict (or None) per city,
+    `format_message(weather)` renders it, and `deliver(subscription, message)`
+    sends or stores the alert. The blocking work runs on a worker thread.
+    """
+
+    def __init__(self, subscriptions, fetch_many, format_message, deliver, coalesce_window=COALESCE_WINDOW):
+        self.fetch_many = fetch_many
+        self.format_message = format_message
+        self.deliver = deliver
+        self.coalesce_window = coalesce_window
+        self._counter = itertools.count()
+        self._queue = []
+        self._wakeup = None
+        now = datetime.now(timezone.utc)
+        for subscription in subscriptions:
+            self._push(subscription, now)
+
+    def _push(self, subscription, after):
+        fire_at = next_fire_time(subscription, after).timestamp()
+        heapq.heappush(self._queue, (fire_at, next(self._counter), subscription))
+
+    def add(self, subscription):
+        """Add a subscription while running; the loop re-plans its sleep."""
+        self._push(subscription, datetime.now(timezone.utc))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def due_batch(self, now):
+        """Pop every subscription due by `now` + coalesce window."""
+        batch = []
+        while self._queue and self._queue[0][0] <= now + self.coalesce_window:
+            fire_at, _, subscription = heapq.heappop(self._queue)
+            batch.append((fire_at, subscription))
+        return batch
+
+    def fire(self, batch):
+        """Fetch each city in the batch once and deliver every subscriber's alert. Returns alerts delivered."""
+        cities = list(dict.fromkeys(subscription.city for _, subscription in batch))
+        messages = {city: self.format_message(weather) for city, weather in zip(cities, self.fetch_many(cities))}
+        for _, subscription in batch:
+            self.deliver(subscription, messages[subscription.city])
+        return len(batch)
+
+    async def run(self, max_batches=None):
+        """Fire alerts until cancelled (or for `max_batches` batches)."""
+        self._wakeup = asyncio.Event()
+        batches = 0
+        print(f"Weather alert scheduler started ({len(self._queue)} subscriptions)")
+
+        while self._queue and (max_batches is None or batches < max_batches):
+            delay = self._queue[0][0] - time.time()
+            if delay > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            batch = self.due_batch(time.time())
+            batches += 1
+            print(f"Sending {len(batch)} alerts for {len({s.city for _, s in batch})} cities")
+            try:
+                await asyncio.to_thread(self.fire, batch)
+            except Exception as e:
+                print(f"Weather alert batch failed: {e}")
+            for fire_at, subscription in batch:
+                self._push(subscription, datetime.fromtimestamp(fire_at, timezone.utc))
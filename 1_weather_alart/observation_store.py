@@ -0,0 +1,332 @@
+import argparse
+import gzip
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+OBSERVATIONS_DIR = "observations"
+MAX_PARTITION_BYTES = 16 * 1024 * 1024  # start a new partition file within the month past this size
+DAY = 24 * 60 * 60
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS observations (
+        city TEXT NOT NULL,
+        observed_at REAL NOT NULL,
+        temp REAL,
+        feels_like REAL,
+        humidity REAL,
+        condition TEXT,
+        rain REAL
+    );
+    CREATE INDEX IF NOT EXISTS idx_observations_city_time ON observations (city, observed_at);
+"""
+
+ROLLUP_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS daily (
+        city TEXT NOT NULL,
+        day TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        temp_sum REAL NOT NULL,
+        temp_min REAL NOT NULL,
+        temp_max REAL NOT NULL,
+        feels_like_sum REAL NOT NULL,
+        humidity_sum REAL NOT NULL,
+        rain_sum REAL NOT NULL,
+        PRIMARY KEY (city, day)
+    );
+    CREATE TABLE IF NOT EXISTS latest (
+        city TEXT PRIMARY KEY,
+        observed_at REAL NOT NULL
+    );
+"""
+
+COLUMNS = ("city", "observed_at", "temp", "feels_like", "humidity", "condition", "rain")
+
+
+def _month(ts):
+    return datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m")
+
+
+def _day(ts):
+    return datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%d")
+
+
+def _partition_key(name):
+    """Sort key for partition names: "obs-2024-05" < "obs-2024-05.2" < "obs-2024-05.10"."""
+    month, _, sequence = name.partition(".")
+    return month, int(sequence or 0)
+
+
+class ObservationStore:
+    """
+    Typed weather observations in monthly SQLite partitions.
+
+    Each month is written to its own file (a new file is started when one
+    grows past `max_partition_bytes`). Once a month is over its partitions
+    are vacuumed and gzip-compressed; a manifest records every partition's
+    time range and row count so queries only open the ones they need.
+    A small rollup database keeps per-city daily sums, so aggregates such as
+    "last 30 days' average temperature" never read raw rows.
+    """
+
+    def __init__(self, directory=OBSERVATIONS_DIR, max_partition_bytes=MAX_PARTITION_BYTES):
+        self.directory = directory
+        self.max_partition_bytes = max_partition_bytes
+        self._lock = threading.Lock()
+        self._open = {}  # partition name -> connection
+        self._new_month = None
+        os.makedirs(directory, exist_ok=True)
+
+        self.manifest_file = os.path.join(directory, "manifest.json")
+        if os.path.exists(self.manifest_file):
+            with open(self.manifest_file, "r", encoding="utf-8") as f:
+                self.manifest = json.load(f)
+        else:
+            self.manifest = {"partitions": {}}
+
+        self._rollups = sqlite3.connect(os.path.join(directory, "rollups.sqlite"), timeout=30, check_same_thread=False)
+        self._rollups.execute("PRAGMA journal_mode=WAL")
+        self._rollups.execute("PRAGMA synchronous=NORMAL")
+        self._rollups.executescript(ROLLUP_SCHEMA)
+        self._rollups.commit()
+
+    # === Partitions ===
+    def _path(self, name):
+        return os.path.join(self.directory, f"{name}.sqlite")
+
+    def _save_manifest(self):
+        tmp = f"{self.manifest_file}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp, self.manifest_file)
+
+    def _connect(self, name):
+        conn = self._open.get(name)
+        if conn is None:
+            conn = sqlite3.connect(self._path(name), timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._open[name] = conn
+        return conn
+
+    def _active_partition(self, month):
+        """Name of the partition currently written for `month`, rotating when it is too big."""
+        names = sorted((name for name, meta in self.manifest["partitions"].items()
+                        if meta["month"] == month and not meta["compressed"]), key=_partition_key)
+        if names:
+            name = names[-1]
+            if os.path.exists(self._path(name)) and os.path.getsize(self._path(name)) < self.max_partition_bytes:
+                return name
+        sequence = sum(1 for meta in self.manifest["partitions"].values() if meta["month"] == month)
+        if sequence == 0:
+            self._new_month = max(self._new_month or month, month)
+        name = f"obs-{month}" if sequence == 0 else f"obs-{month}.{sequence}"
+        self.manifest["partitions"][name] = {"month": month, "start": None, "end": None, "rows": 0, "compressed": False}
+        return name
+
+    # === Writing ===
+    def record(self, weather_data, observed_at=None):
+        return self.record_many([weather_data], observed_at)
+
+    def record_many(self, weather_list, observed_at=None):
+        """
+        Persist get_weather dicts (None entries are skipped). An observation
+        older than or equal to the last one stored for its city is ignored, so
+        cached responses are not stored twice. Returns the number stored.
+        """
+        now = observed_at or time.time()
+        stored = 0
+        touched = set()
+        with self._lock:
+            self._new_month = None
+            for weather_data in weather_list:
+                if not weather_data:
+                    continue
+                row = (
+                    weather_data["city"],
+                    float(weather_data.get("observed_at") or now),
+                    weather_data.get("temp"),
+                    weather_data.get("feels_like"),
+                    weather_data.get("humidity"),
+                    weather_data.get("weather"),
+                    weather_data.get("rain_chance") or 0.0,
+                )
+                latest = self._rollups.execute("SELECT observed_at FROM latest WHERE city = ?", (row[0],)).fetchone()
+                if latest and row[1] <= latest[0]:
+                    continue
+
+                name = self._active_partition(_month(row[1]))
+                conn = self._connect(name)
+                conn.execute(f"INSERT INTO observations ({', '.join(COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?, ?)", row)
+                touched.add(name)
+
+                meta = self.manifest["partitions"][name]
+                meta["rows"] += 1
+                meta["start"] = row[1] if meta["start"] is None else min(meta["start"], row[1])
+                meta["end"] = row[1] if meta["end"] is None else max(meta["end"], row[1])
+
+                city, ts, temp, feels_like, humidity, _, rain = row
+                self._rollups.execute(
+                    "INSERT INTO daily (city, day, count, temp_sum, temp_min, temp_max, feels_like_sum, humidity_sum, rain_sum) "
+                    "VALUES (?, ?, 1, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (city, day) DO UPDATE SET count = count + 1, temp_sum = temp_sum + excluded.temp_sum, "
+                    "temp_min = MIN(temp_min, excluded.temp_min), temp_max = MAX(temp_max, excluded.temp_max), "
+                    "feels_like_sum = feels_like_sum + excluded.feels_like_sum, "
+                    "humidity_sum = humidity_sum + excluded.humidity_sum, rain_sum = rain_sum + excluded.rain_sum",
+                    (city, _day(ts), temp, temp, temp, feels_like, humidity, rain)
+                )
+                self._rollups.execute("INSERT OR REPLACE INTO latest (city, observed_at) VALUES (?, ?)", (city, ts))
+                stored += 1
+
+            for name in touched:
+                self._open[name].commit()
+            self._rollups.commit()
+            if stored:
+                self._save_manifest()
+            new_month = self._new_month
+
+        # A month just started: close out the ones before it
+        if new_month:
+            self.compact(before_month=new_month)
+        return stored
+
+    def compact(self, before_month=None):
+        """Vacuum and gzip every partition of months before `before_month` ("YYYY-MM", default: this month)."""
+        current = before_month or _month(time.time())
+        compressed = []
+        with self._lock:
+            for name, meta in sorted(self.manifest["partitions"].items(), key=lambda item: _partition_key(item[0])):
+                if meta["compressed"] or meta["month"] >= current:
+                    continue
+                conn = self._open.pop(name, None) or sqlite3.connect(self._path(name))
+                # Rollback journal mode, so the file can be read back from memory after decompression
+                conn.execute("PRAGMA journal_mode=DELETE")
+                conn.execute("VACUUM")
+                conn.close()
+                with open(self._path(name), "rb") as src, gzip.open(f"{self._path(name)}.gz.tmp", "wb") as dst:
+                    dst.write(src.read())
+                os.replace(f"{self._path(name)}.gz.tmp", f"{self._path(name)}.gz")
+                os.remove(self._path(name))
+                meta["compressed"] = True
+                compressed.append(name)
+            if compressed:
+                self._save_manifest()
+        return compressed
+
+    # === Reading ===
+    def _read_partition(self, name, sql, params):
+        meta = self.manifest["partitions"][name]
+        if not meta["compressed"]:
+            return self._connect(name).execute(sql, params).fetchall()
+        with gzip.open(f"{self._path(name)}.gz", "rb") as f:
+            data = f.read()
+        if hasattr(sqlite3.Connection, "deserialize"):
+            conn = sqlite3.connect(":memory:")
+            try:
+                conn.deserialize(data)
+                return conn.execute(sql, params).fetchall()
+            finally:
+                conn.close()
+
+        # Python < 3.11 has no Connection.deserialize: read it from a temporary file instead
+        fd, tmp = tempfile.mkstemp(suffix=".sqlite", dir=self.directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            conn = sqlite3.connect(tmp)
+            try:
+                return conn.execute(sql, params).fetchall()
+            finally:
+                conn.close()
+        finally:
+            os.remove(tmp)
+
+    def query(self, city=None, start=None, end=None):
+        """Observations (dicts, oldest first) between unix times `start` and `end`, optionally for one city."""
+        sql = f"SELECT {', '.join(COLUMNS)} FROM observations WHERE 1 = 1"
+        params = []
+        if start is not None:
+            sql += " AND observed_at >= ?"
+            params.append(start)
+        if end is not None:
+            sql += " AND observed_at <= ?"
+            params.append(end)
+        if city:
+            sql += " AND city = ?"
+            params.append(city)
+
+        rows = []
+        with self._lock:
+            for name, meta in sorted(self.manifest["partitions"].items(), key=lambda item: _partition_key(item[0])):
+                if not meta["rows"]:
+                    continue
+                # The manifest's time range skips partitions outside the query
+                if (start is not None and meta["end"] < start) or (end is not None and meta["start"] > end):
+                    continue
+                rows.extend(self._read_partition(name, sql, params))
+        rows.sort(key=lambda row: row[1])
+        return [dict(zip(COLUMNS, row)) for row in rows]
+
+    def summary(self, city, days=30, now=None):
+        """Aggregates for `city` over the last `days` days (whole UTC days) from the daily rollups."""
+        since = _day((now or time.time()) - (days - 1) * DAY)
+        with self._lock:
+            row = self._rollups.execute(
+                "SELECT SUM(count), SUM(temp_sum), MIN(temp_min), MAX(temp_max), SUM(feels_like_sum), "
+                "SUM(humidity_sum), SUM(rain_sum) FROM daily WHERE city = ? AND day >= ?",
+                (city, since)
+            ).fetchone()
+        count = row[0] or 0
+        if not count:
+            return {"city": city, "days": days, "count": 0}
+        return {
+            "city": city,
+            "days": days,
+            "count": count,
+            "temp_avg": row[1] / count,
+            "temp_min": row[2],
+            "temp_max": row[3],
+            "feels_like_avg": row[4] / count,
+            "humidity_avg": row[5] / count,
+            "rain_total": row[6],
+        }
+
+    def average(self, city, field="temp", days=30, now=None):
+        """Average of `field` (temp, feels_like, humidity) for `city` over the last `days` days, or None."""
+        return self.summary(city, days, now).get(f"{field}_avg")
+
+    def close(self):
+        with self._lock:
+            for conn in self._open.values():
+                conn.close()
+            self._open.clear()
+            self._rollups.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query stored weather observations")
+    parser.add_argument("city")
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--rows", action="store_true", help="print the observations instead of the summary")
+    args = parser.parse_args()
+
+    store = ObservationStore()
+    try:
+        if args.rows:
+            for row in store.query(args.city, start=time.time() - args.days * DAY):
+                observed = datetime.fromtimestamp(row["observed_at"]).strftime("%Y-%m-%d %H:%M")
+                print(f"{observed}  {row['temp']:.1f}°C  feels {row['feels_like']:.1f}°C  "
+                      f"{row['humidity']:.0f}%  {row['condition']}  rain {row['rain']}")
+        else:
+            print(json.dumps(store.summary(args.city, args.days), indent=2, ensure_ascii=False))
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
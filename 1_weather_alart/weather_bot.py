@@ -1,33 +1,206 @@
-import requests
-import schedule
-import time
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
-def get_weather(city="San Jose"):
-    api_key = "enter_your_api_key"  # Enter API key
-    url = f"https://api.openweathermap.org/data/2.5/weather?q={city}&appid={api_key}&units=metric&lang=en"
-    
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # common/ (repository root)
+
+from common.http_client import get_client
+from alert_rules import alert_lines, clothing_for, forecast_batch
+from alert_scheduler import AlertScheduler, Subscription, load_subscriptions
+from observation_store import ObservationStore
+from weather_cache import WEATHER_TTL, TTLCache
+
+API_KEY = "enter_your_api_key"  # Enter API key
+API_BASE = os.getenv("OPENWEATHER_BASE_URL", "https://api.openweathermap.org")  # override to use a local stand-in
+WEATHER_URL = f"{API_BASE}/data/2.5/weather"
+GROUP_URL = f"{API_BASE}/data/2.5/group"
+FORECAST_URL = f"{API_BASE}/data/2.5/forecast"
+DEFAULT_CITY = "San Jose"
+CITIES_FILE = "cities.txt"        # one city per line; alerts for every city listed
+CITY_IDS_FILE = "city_ids.json"   # cached city name -> OpenWeatherMap city ID
+GROUP_SIZE = 20                   # the group endpoint accepts at most 20 IDs per call
+MAX_WORKERS = 8                   # concurrent requests when fetching many cities
+WEATHER_CACHE_FILE = "weather_cache.json"  # API responses, reused for WEATHER_TTL seconds
+FORECAST_CACHE_FILE = "forecast_cache.json"
+FORECAST_TTL = 60 * 60                     # 3-hourly forecasts change slowly
+USE_FORECAST = os.getenv("WEATHER_USE_FORECAST", "1") == "1"  # forecast-based alert rules
+ALERTS_FILE = "weather_alerts.txt"
+ALERT_HASHES_FILE = "alert_hashes.json"    # recently written alerts, for deduplication
+ALERT_DEDUP_WINDOW = 60 * 60               # identical alerts within this many seconds are written once
+
+weather_cache = TTLCache(WEATHER_CACHE_FILE, ttl=WEATHER_TTL)
+forecast_cache = TTLCache(FORECAST_CACHE_FILE, ttl=FORECAST_TTL)
+recent_alerts = TTLCache(ALERT_HASHES_FILE, ttl=ALERT_DEDUP_WINDOW)
+
+def _weather_dict(city, data):
+    return {
+        'city': city,
+        'temp': data['main']['temp'],
+        'feels_like': data['main']['feels_like'],
+        'humidity': data['main']['humidity'],
+        'weather': data['weather'][0]['description'],
+        'rain_chance': data.get('rain', {}).get('1h', 0),
+        'observed_at': data.get('dt')
+    }
+
+_observations = None
+
+def get_observation_store():
+    """Store of every observation fetched (opened on first use)."""
+    global _observations
+    if _observations is None:
+        _observations = ObservationStore()
+    return _observations
+
+def _cache_key(city, units):
+    return TTLCache.key(city.strip().casefold(), units)
+
+def _fetch_current(city, units="metric", save=True):
+    """Current weather response for `city`, served from the TTL cache when fresh."""
+    cached = weather_cache.get(_cache_key(city, units))
+    if cached is not None:
+        return cached
+    params = {'q': city, 'appid': API_KEY, 'units': units, 'lang': 'en'}
+    data = get_client().get(WEATHER_URL, params=params).json()
+    if 'main' in data:  # errors (bad key, unknown city) are not cached
+        weather_cache.put(_cache_key(city, units), data)
+        if save:
+            weather_cache.save()
+    return data
+
+def get_weather(city=DEFAULT_CITY, units="metric"):
     try:
-        response = requests.get(url)
-        data = response.json()
-        
-        return {
-            'city': city,  
-            'temp': data['main']['temp'],
-            'feels_like': data['main']['feels_like'],
-            'humidity': data['main']['humidity'],
-            'weather': data['weather'][0]['description'],
-            'rain_chance': data.get('rain', {}).get('1h', 0)
-        }
+        weather_data = _weather_dict(city, _fetch_current(city, units))
     except Exception as e:
         print(f"Weather data loading failed: {e}")
         return None
+    if units == "metric":
+        get_observation_store().record(weather_data)
+    return weather_data
+
+def load_cities(filename=CITIES_FILE):
+    if not os.path.exists(filename):
+        return [DEFAULT_CITY]
+    with open(filename, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()] or [DEFAULT_CITY]
+
+def resolve_city_ids(cities):
+    """Map city names to OpenWeatherMap city IDs. Unknown names are looked up once, concurrently, and cached."""
+    city_ids = {}
+    if os.path.exists(CITY_IDS_FILE):
+        with open(CITY_IDS_FILE, "r", encoding="utf-8") as f:
+            city_ids = json.load(f)
+
+    def lookup(city):
+        try:
+            return city, _fetch_current(city, save=False)['id']
+        except Exception as e:
+            print(f"City lookup failed for {city}: {e}")
+            return city, None
+
+    missing = [city for city in dict.fromkeys(cities) if city not in city_ids]
+    if missing:
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+            found = {city: city_id for city, city_id in pool.map(lookup, missing) if city_id is not None}
+        weather_cache.save()
+        if found:
+            city_ids.update(found)
+            tmp = f"{CITY_IDS_FILE}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(city_ids, f, indent=2, ensure_ascii=False)
+            os.replace(tmp, CITY_IDS_FILE)
+
+    return {city: city_ids[city] for city in cities if city in city_ids}
+
+def _fetch_group(city_ids, units="metric"):
+    params = {'id': ",".join(str(city_id) for city_id in city_ids), 'appid': API_KEY, 'units': units, 'lang': 'en'}
+    try:
+        return get_client().get(GROUP_URL, params=params).json().get('list', [])
+    except Exception as e:
+        print(f"Weather data loading failed for {len(city_ids)} cities: {e}")
+        return []
+
+def get_weather_many(cities, units="metric"):
+    """
+    Weather for many cities: 20 city IDs per group call, chunks fetched concurrently.
+    Returns one get_weather-style dict per city, in order (None where it failed).
+    """
+    city_ids = resolve_city_ids(cities)
+    by_city = {}
+    for city in city_ids:
+        cached = weather_cache.get(_cache_key(city, units))
+        if cached is not None:
+            by_city[city] = cached
+
+    # Only cities without a fresh cached response are fetched
+    ids = list(dict.fromkeys(city_id for city, city_id in city_ids.items() if city not in by_city))
+    chunks = [ids[i:i + GROUP_SIZE] for i in range(0, len(ids), GROUP_SIZE)]
+    by_id = {}
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        for items in pool.map(lambda chunk: _fetch_group(chunk, units), chunks):
+            by_id.update((item['id'], item) for item in items)
+
+    for city, city_id in city_ids.items():
+        if city not in by_city and city_id in by_id:
+            by_city[city] = by_id[city_id]
+            weather_cache.put(_cache_key(city, units), by_id[city_id])
+    if by_id:
+        weather_cache.save()
+
+    results = []
+    for city in cities:
+        data = by_city.get(city)
+        results.append(_weather_dict(city, data) if data else None)
+    if units == "metric":
+        get_observation_store().record_many(results)
+    return results
+
+def get_forecast_many(cities, units="metric"):
+    """3-hourly forecast responses, one per city in order (None where it failed), fetched concurrently."""
+    city_ids = resolve_city_ids(cities)
+
+    def fetch(city):
+        key = _cache_key(city, units)
+        cached = forecast_cache.get(key)
+        if cached is not None or city not in city_ids:
+            return cached
+        params = {'id': city_ids[city], 'appid': API_KEY, 'units': units, 'lang': 'en'}
+        try:
+            data = get_client().get(FORECAST_URL, params=params).json()
+        except Exception as e:
+            print(f"Forecast loading failed for {city}: {e}")
+            return None
+        if 'list' not in data:
+            return None
+        forecast_cache.put(key, data)
+        return data
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        forecasts = list(pool.map(fetch, cities))
+    forecast_cache.save()
+    return forecasts
+
+def add_forecast_alerts(weather_list):
+    """Evaluate the forecast alert rules for all cities at once and attach the lines as 'forecast_alerts'."""
+    cities = [weather_data['city'] for weather_data in weather_list if weather_data]
+    if not cities:
+        return weather_list
+    forecasts = get_forecast_many(cities)
+    lines = alert_lines(forecast_batch(cities, forecasts))
+    available = {city for city, forecast in zip(cities, forecasts) if forecast}
+    for weather_data in weather_list:
+        if weather_data and weather_data['city'] in available:
+            weather_data['forecast_alerts'] = lines[weather_data['city']]
+    return weather_list
 
 def clothing_recommendation(temp):
-    if temp < 5: return "🧥 It's essential to wear a coat!"
-    elif temp < 15: return "🧥 Wear a thick coat"
-    elif temp < 25: return "👕 Wear a moderate outfit"
-    else: return "👕 Wear light clothing"
+    return str(clothing_for([temp])[0])
 
 def format_weather_message(weather_data):
     if not weather_data:
@@ -46,37 +219,72 @@ def format_weather_message(weather_data):
 ☁️ Weather: {weather}
 {clothing_recommendation(temp)}"""  # Clothing recommendation
     
+    forecast_alerts = weather_data.get('forecast_alerts')
+    if forecast_alerts is not None:
+        # Forecast rules (umbrella, commute cold, gusts, ...) replace the current-conditions check
+        for line in forecast_alerts:
+            message += f"\n{line}"
     # Umbrella alert logic
-    if weather_data['rain_chance'] > 0 or any(word in weather for word in ['rain', 'snow', 'thunder']):
+    elif weather_data['rain_chance'] > 0 or any(word in weather for word in ['rain', 'snow', 'thunder']):
         message += "\n☔ Don't forget to bring an umbrella!"
     
     return message
 
 def save_weather_alert(message):
+    """Append an alert to ALERTS_FILE, unless the same alert was written within ALERT_DEDUP_WINDOW. Returns True if written."""
+    digest = hashlib.sha256(message.encode("utf-8")).hexdigest()
+    if recent_alerts.get(digest) is not None:
+        print("Weather alert unchanged, not saved again")
+        return False
+
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    filename = "weather_alerts.txt"
+    filename = ALERTS_FILE
     
     with open(filename, "a", encoding="utf-8") as f:
         f.write(f"[{timestamp}]\n{message}\n{'='*50}\n\n")
-    
+
+    recent_alerts.put(digest, timestamp)
+    recent_alerts.save()
     print(f"Weather alert saved: {filename}")
+    return True
+
+def fetch_weather(cities):
+    """get_weather for a single city, batched get_weather_many for several, plus forecast alerts."""
+    if len(cities) == 1:
+        weather_list = [get_weather(cities[0])]
+    else:
+        weather_list = get_weather_many(cities)
+    return add_forecast_alerts(weather_list) if USE_FORECAST else weather_list
 
 def daily_weather_alert():
     print("Weather alert running...")
-    weather_data = get_weather()
-    message = format_weather_message(weather_data)
-    save_weather_alert(message)
+    for weather_data in fetch_weather(load_cities()):
+        message = format_weather_message(weather_data)
+        save_weather_alert(message)
     print("Completed!")
 
-# Scheduling: every day at 9am
-schedule.every().day.at("09:00").do(daily_weather_alert)
+def main():
+    parser = argparse.ArgumentParser(description="Daily weather alerts at each subscriber's local time")
+    parser.add_argument("--once", action="store_true", help="send alerts for cities.txt now and exit")
+    args = parser.parse_args()
 
-# Test: run immediately
-print("Test run:")
-daily_weather_alert()
+    if args.once:
+        daily_weather_alert()
+        return 0
+
+    # subscriptions.csv, or a 9am server-local alert for every city in cities.txt
+    subscriptions = load_subscriptions() or [Subscription("default", city) for city in load_cities()]
+    scheduler = AlertScheduler(
+        subscriptions,
+        fetch_many=fetch_weather,
+        format_message=format_weather_message,
+        deliver=lambda subscription, message: save_weather_alert(message),
+    )
+    try:
+        asyncio.run(scheduler.run())
+    except KeyboardInterrupt:
+        print("Weather alert bot stopped")
+    return 0
 
-# Main loop
-print("Weather alert bot started! (runs every day at 9am)")
-while True:
-    schedule.run_pending()
-    time.sleep(60)
\ No newline at end of file
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+import json
+import os
+import threading
+import time
+
+# OpenWeatherMap refreshes current conditions about every 10 minutes
+WEATHER_TTL = 10 * 60
+
+
+class TTLCache:
+    """
+    Small JSON-file backed cache whose entries expire after `ttl` seconds.
+
+    Entries live in memory and are written to disk by `save()` (atomically,
+    dropping expired entries), so they survive restarts of the bot.
+    """
+
+    def __init__(self, path, ttl=WEATHER_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+
+    @staticmethod
+    def key(*parts):
+        return "|".join(str(part) for part in parts)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if time.time() - stored_at >= self.ttl:
+                del self._entries[key]
+                return None
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = [time.time(), value]
+
+    def save(self):
+        if not self.path:
+            return
+        now = time.time()
+        with self._lock:
+            self._entries = {key: entry for key, entry in self._entries.items() if now - entry[0] < self.ttl}
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
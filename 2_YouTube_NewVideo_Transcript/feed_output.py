@@ -0,0 +1,187 @@
+import json
+import os
+from datetime import datetime, timezone
+from html import escape
+
+FEED_DIR = "feed"
+PAGE_SIZE = 100      # entries per archive page; full pages are never rewritten
+FEED_ENTRIES = 50    # entries in the Atom feed
+INDEX_ENTRIES = 20   # latest entries shown on the index page
+FEED_TITLE = "New YouTube Videos"
+
+PAGE_STYLE = "<style>body{font-family:Arial;margin:20px;} a{color:#1976d2;}</style>\n"
+
+
+def write_atomic(path, text):
+    """Write a whole file in one buffered pass and swap it in, so readers never see half a page."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def render_entry_html(video):
+    return (
+        "<div style='margin-bottom:15px;'>\n"
+        f"<p><strong>[{escape(video['timestamp'])}]</strong></p>\n"
+        f"<p>📺 <a href='{escape(video['url'])}' target='_blank'>{escape(video['title'])}</a></p>\n"
+        f"<p>📺 Channel: {escape(video['channel_name'] or '')}</p>\n"
+        "</div>\n"
+    )
+
+
+def render_entry_text(video):
+    return (
+        f"[{video['timestamp']}]\n"
+        f"Title: {video['title']}\n"
+        f"Link: {video['url']}\n"
+        f"Channel: {video['channel_name']}\n"
+        f"Channel ID: {video['channel_id']}\n"
+        + "-" * 50 + "\n"
+    )
+
+
+def render_html_page(title, entries, nav="", header="", empty="<p>No new videos found.</p>\n"):
+    parts = [
+        "<!DOCTYPE html>\n<html lang='en'>\n<head>\n",
+        f"<meta charset='UTF-8'>\n<title>{escape(title)}</title>\n",
+        PAGE_STYLE,
+        f"</head>\n<body>\n<h1>{escape(title)}</h1>\n",
+        header,
+        nav,
+    ]
+    parts.extend(render_entry_html(video) for video in entries)
+    if not entries:
+        parts.append(empty)
+    parts.append(nav)
+    parts.append("</body>\n</html>")
+    return "".join(parts)
+
+
+def render_notification_text(entries, checked_at=None):
+    checked_at = checked_at or datetime.now()
+    parts = [
+        "=== New YouTube Videos Notification ===\n",
+        f"Check time: {checked_at.strftime('%Y-%m-%d %H:%M:%S')}\n\n",
+    ]
+    parts.extend(render_entry_text(video) for video in entries)
+    if not entries:
+        parts.append("No new videos found.\n")
+    return "".join(parts)
+
+
+def _atom_time(value):
+    """RFC 3339 timestamp for Atom from an ISO string (naive times are local)."""
+    moment = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if moment.tzinfo is None:
+        moment = moment.astimezone()
+    return moment.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def render_atom(entries, title=FEED_TITLE, feed_id="urn:youtube-monitor:new-videos"):
+    updated = _atom_time(entries[0]["timestamp"]) if entries else _atom_time(datetime.now().isoformat())
+    parts = [
+        '<?xml version="1.0" encoding="utf-8"?>\n',
+        '<feed xmlns="http://www.w3.org/2005/Atom">\n',
+        f"<title>{escape(title)}</title>\n<id>{escape(feed_id)}</id>\n<updated>{updated}</updated>\n",
+    ]
+    for video in entries:
+        video_id = video.get("video_id") or video["url"].rsplit("=", 1)[-1]
+        parts.append(
+            "<entry>\n"
+            f"<title>{escape(video['title'])}</title>\n"
+            f"<id>yt:video:{escape(video_id)}</id>\n"
+            f"<link rel='alternate' href='{escape(video['url'])}'/>\n"
+            f"<author><name>{escape(video['channel_name'] or '')}</name></author>\n"
+            f"<published>{_atom_time(video.get('publishedAt') or video['timestamp'])}</published>\n"
+            f"<updated>{_atom_time(video['timestamp'])}</updated>\n"
+            "</entry>\n"
+        )
+    parts.append("</feed>\n")
+    return "".join(parts)
+
+
+class FeedArchive:
+    """
+    Rolling, paginated archive of every new video, plus an Atom feed.
+
+    Entries are appended to numbered pages of `page_size` (page 1 holds the
+    oldest). Only the newest, still-filling page, the index page and the feed
+    are rewritten on each append; full pages are frozen, so the cost of an
+    append does not grow with the size of the archive. Each page keeps its
+    entries in a small JSON sidecar so it can be re-rendered.
+    """
+
+    def __init__(self, directory=FEED_DIR, page_size=PAGE_SIZE, feed_entries=FEED_ENTRIES):
+        self.directory = directory
+        self.page_size = page_size
+        self.feed_entries = feed_entries
+        os.makedirs(directory, exist_ok=True)
+        self.state_file = os.path.join(directory, "state.json")
+        if os.path.exists(self.state_file):
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                self.state = json.load(f)
+        else:
+            self.state = {"pages": 0, "total": 0}
+
+    def _path(self, page, ext):
+        return os.path.join(self.directory, f"page-{page:05d}.{ext}")
+
+    def _load_page(self, page):
+        if page < 1 or not os.path.exists(self._path(page, "json")):
+            return []
+        with open(self._path(page, "json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write_page(self, page, entries, last_page):
+        write_atomic(self._path(page, "json"), json.dumps(entries, ensure_ascii=False))
+        links = []
+        if page < last_page:
+            links.append(f"<a href='page-{page + 1:05d}.html'>← Newer</a>")
+        links.append("<a href='index.html'>Index</a>")
+        if page > 1:
+            links.append(f"<a href='page-{page - 1:05d}.html'>Older →</a>")
+        nav = f"<p>{' | '.join(links)}</p>\n"
+        # Newest first within a page
+        write_atomic(self._path(page, "html"), render_html_page(f"{FEED_TITLE} — page {page}", entries[::-1], nav))
+
+    def append(self, videos):
+        """Add new-video records (oldest first) and refresh the newest page, index and feed."""
+        if not videos:
+            return
+        pages = self.state["pages"]
+        current = self._load_page(pages) if pages else []
+        if not pages:
+            pages = 1
+
+        for video in videos:
+            if len(current) >= self.page_size:
+                # Freeze the full page once, now that a newer page exists to link to
+                self._write_page(pages, current, pages + 1)
+                pages, current = pages + 1, []
+            current.append({key: video.get(key) for key in
+                            ("video_id", "timestamp", "url", "title", "channel_id", "channel_name", "publishedAt")})
+
+        self._write_page(pages, current, pages)
+        self.state = {"pages": pages, "total": self.state["total"] + len(videos)}
+
+        latest = current[::-1]
+        page = pages - 1
+        while len(latest) < max(self.feed_entries, INDEX_ENTRIES) and page >= 1:
+            latest.extend(self._load_page(page)[::-1])
+            page -= 1
+
+        self._write_index(latest[:INDEX_ENTRIES])
+        write_atomic(os.path.join(self.directory, "atom.xml"), render_atom(latest[:self.feed_entries]))
+        write_atomic(self.state_file, json.dumps(self.state))
+
+    def _write_index(self, latest):
+        pages = self.state["pages"]
+        page_links = "".join(
+            f"<li><a href='page-{page:05d}.html'>Page {page}</a></li>\n" for page in range(pages, 0, -1)
+        )
+        header = (
+            f"<p>{self.state['total']} videos · <a href='atom.xml'>Atom feed</a></p>\n"
+            f"<h2>Pages</h2>\n<ul>\n{page_links}</ul>\n<h2>Latest</h2>\n"
+        )
+        write_atomic(os.path.join(self.directory, "index.html"), render_html_page(FEED_TITLE, latest, header=header))
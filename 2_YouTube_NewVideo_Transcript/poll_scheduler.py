@@ -0,0 +1,91 @@
+import time
+from datetime import datetime
+from statistics import median
+
+from common.scheduler import DueScheduler
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+MIN_POLL_INTERVAL = 10 * MINUTE   # never poll a channel more often than this
+MAX_POLL_INTERVAL = DAY           # dormant channels are still checked daily
+DEFAULT_POLL_INTERVAL = HOUR      # channels without enough upload history yet
+POLLS_PER_UPLOAD = 4              # polls per typical gap between uploads
+CADENCE_SAMPLES = 10              # recent publish times used to learn the cadence
+RETRY_EVERY = HOUR                # how often pending/failed transcripts are retried
+
+
+def _timestamp(published_at):
+    return datetime.fromisoformat(published_at.replace("Z", "+00:00")).timestamp()
+
+
+def poll_interval(publish_times, now=None):
+    """
+    Seconds until a channel should be polled again, from its recent publish
+    timestamps (ISO strings, any order).
+
+    The typical gap between uploads is the median of recent gaps; the channel
+    is polled POLLS_PER_UPLOAD times per gap. A channel that has been silent
+    for much longer than its usual gap is backed off in proportion to the
+    silence, so dormant channels drift towards MAX_POLL_INTERVAL.
+    """
+    times = sorted(_timestamp(published_at) for published_at in publish_times if published_at)
+    if len(times) < 2:
+        return DEFAULT_POLL_INTERVAL
+
+    now = now or time.time()
+    gap = median(later - earlier for earlier, later in zip(times, times[1:]))
+    silence = max(now - times[-1], 0)
+    interval = max(gap, silence / 2) / POLLS_PER_UPLOAD
+    return int(min(max(interval, MIN_POLL_INTERVAL), MAX_POLL_INTERVAL))
+
+
+class ChannelScheduler(DueScheduler):
+    """
+    Long-running poller with one next-due time per channel.
+
+    Each cycle polls every due channel in one batch, then re-queues each of
+    them using the upload cadence learned from the publish times in the video
+    store.
+    """
+
+    def __init__(self, watcher, channel_ids, on_new_videos=None):
+        super().__init__(channel_ids)
+        self.watcher = watcher
+        self.on_new_videos = on_new_videos
+        self._last_retry = 0.0
+
+    def next_interval(self, channel_id, now):
+        videos = self.watcher.store.latest_for_channel(channel_id, limit=CADENCE_SAMPLES)
+        return poll_interval([video["publishedAt"] for video in videos], now)
+
+    def poll(self, channel_ids):
+        now = time.time()
+        retry = now - self._last_retry >= RETRY_EVERY
+        if retry:
+            self._last_retry = now
+
+        new_videos = self.watcher.poll(channel_ids, retry=retry)
+
+        now = time.time()
+        for channel_id in channel_ids:
+            self.schedule(channel_id, now + self.next_interval(channel_id, now))
+        if self.on_new_videos:
+            self.on_new_videos(new_videos)
+        return new_videos
+
+    def process(self, channel_ids):
+        print(f"🔍 Polling {len(channel_ids)} due channels ({len(self)} waiting)")
+        self.poll(channel_ids)
+
+    def report_error(self, channel_ids, error, delay):
+        print(f"⚠️ Polling {len(channel_ids)} channels failed: {error} (retrying in {delay:.0f}s)")
+
+    def run(self, max_cycles=None):
+        """Poll due channels until interrupted (or for `max_cycles` poll cycles)."""
+        print(f"👀 Watching {len(self)} channels")
+        try:
+            return super().run(max_cycles)
+        except KeyboardInterrupt:
+            print("👀 Watcher stopped")
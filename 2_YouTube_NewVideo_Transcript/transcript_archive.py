@@ -0,0 +1,306 @@
+import argparse
+import gzip
+import hashlib
+import os
+import re
+import sqlite3
+import sys
+import threading
+from datetime import datetime, timedelta
+
+try:
+    import zstandard
+except ImportError:  # optional; gzip is used when it is not installed
+    zstandard = None
+
+DEFAULT_ARCHIVE_FILE = "transcripts.db"
+EXPORT_DIR = "transcripts"
+
+SUMMARY_PROMPT = (
+    "- Summarize the above financial and investment-related article into exactly 10 concise bullet points.\n"
+    "- Each point should highlight key facts, trends, or implications related to stocks, markets, or companies mentioned in the article.\n"
+    "- Use clear, professional language suitable for investors. Include relevant numbers (e.g., % changes, EPS, revenue) shown in the article.\n"
+    "- Avoid repetition. Maintain chronological or logical order.\n"
+)
+
+
+def compress(text):
+    """Compress a transcript. Returns (codec, data)."""
+    raw = text.encode("utf-8")
+    if zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=10).compress(raw)
+    return "gzip", gzip.compress(raw, compresslevel=9)
+
+
+def decompress(codec, data):
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Archive contains zstd blobs; install the 'zstandard' package to read them")
+        return zstandard.ZstdDecompressor().decompress(data).decode("utf-8")
+    return gzip.decompress(data).decode("utf-8")
+
+
+def content_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def transcript_filename(video, archived_at, directory=EXPORT_DIR):
+    """Per-file name used since the first version: YYYYMMDD_ChannelName_VideoTitle.txt"""
+    safe_channel_name = re.sub(r'[<>:"/\\|?*]', '_', video["channel_name"] or "")
+    # Remove parentheses part from title (often redundant channel name)
+    title_without_parentheses = re.sub(r'\s*\([^)]*\)\s*$', '', video["title"] or "")
+    safe_title = re.sub(r'[<>:"/\\|?*]', '_', title_without_parentheses)
+    return os.path.join(directory, f"{archived_at.strftime('%Y%m%d')}_{safe_channel_name}_{safe_title}.txt")
+
+
+def render_transcript_file(video, transcript, archived_at):
+    """Copy-paste friendly text: metadata, transcript and the summary prompt."""
+    return (
+        f"Title: {video['title']}\n"
+        f"Channel ID: {video['channel_id']}\n"
+        f"URL: {video['url']}\n"
+        f"Date: {archived_at.strftime('%Y-%m-%d %H:%M')}\n"
+        + "-" * 50 + "\n\n"
+        "TRANSCRIPT:\n"
+        f"{transcript}"
+        "\n\n" + "=" * 50 + "\n"
+        + SUMMARY_PROMPT
+    )
+
+
+class TranscriptArchive:
+    """
+    Compressed, searchable store of every transcript fetched.
+
+    Transcript text is compressed (zstd when available, else gzip) and stored
+    once per content hash; documents are keyed by video ID, so re-archiving a
+    video replaces it instead of adding a copy. A contentless FTS5 index over
+    title and transcript answers keyword queries without reading the blobs.
+    """
+
+    def __init__(self, path=DEFAULT_ARCHIVE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS blobs (
+                hash TEXT PRIMARY KEY,
+                codec TEXT NOT NULL,
+                data BLOB NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS documents (
+                id INTEGER PRIMARY KEY,
+                video_id TEXT NOT NULL UNIQUE,
+                channel_id TEXT NOT NULL,
+                channel_name TEXT,
+                title TEXT,
+                url TEXT,
+                published_at TEXT,
+                archived_at TEXT NOT NULL,
+                content_hash TEXT NOT NULL REFERENCES blobs (hash)
+            );
+            CREATE INDEX IF NOT EXISTS idx_documents_published ON documents (published_at);
+            CREATE INDEX IF NOT EXISTS idx_documents_channel ON documents (channel_id, published_at);
+            CREATE VIRTUAL TABLE IF NOT EXISTS transcripts_fts USING fts5(
+                title, transcript, content='', tokenize='unicode61 remove_diacritics 2'
+            );
+        """)
+        self._conn.commit()
+
+    def _blob_text(self, digest):
+        codec, data = self._conn.execute(
+            "SELECT codec, data FROM blobs WHERE hash = ?", (digest,)
+        ).fetchone()
+        return decompress(codec, data)
+
+    def add(self, video_id, video, transcript, archived_at=None):
+        """Archive a transcript. Returns False if the same transcript was already archived for this video."""
+        archived_at = archived_at or datetime.now()
+        digest = content_hash(transcript)
+
+        with self._lock:
+            existing = self._conn.execute(
+                "SELECT id, title, content_hash FROM documents WHERE video_id = ?", (video_id,)
+            ).fetchone()
+            if existing and existing[2] == digest:
+                return False
+
+            if self._conn.execute("SELECT 1 FROM blobs WHERE hash = ?", (digest,)).fetchone() is None:
+                codec, data = compress(transcript)
+                self._conn.execute("INSERT INTO blobs (hash, codec, data) VALUES (?, ?, ?)", (digest, codec, data))
+
+            if existing:
+                # Contentless FTS rows are removed by replaying the indexed values
+                doc_id, old_title, old_hash = existing
+                self._conn.execute(
+                    "INSERT INTO transcripts_fts (transcripts_fts, rowid, title, transcript) VALUES ('delete', ?, ?, ?)",
+                    (doc_id, old_title or "", self._blob_text(old_hash))
+                )
+                self._conn.execute(
+                    "UPDATE documents SET channel_id = ?, channel_name = ?, title = ?, url = ?, published_at = ?, "
+                    "archived_at = ?, content_hash = ? WHERE id = ?",
+                    (video["channel_id"], video.get("channel_name"), video.get("title"), video.get("url"),
+                     video.get("publishedAt"), archived_at.isoformat(), digest, doc_id)
+                )
+                if self._conn.execute(
+                    "SELECT 1 FROM documents WHERE content_hash = ?", (old_hash,)
+                ).fetchone() is None:
+                    self._conn.execute("DELETE FROM blobs WHERE hash = ?", (old_hash,))
+            else:
+                doc_id = self._conn.execute(
+                    "INSERT INTO documents (video_id, channel_id, channel_name, title, url, published_at, archived_at, content_hash) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (video_id, video["channel_id"], video.get("channel_name"), video.get("title"), video.get("url"),
+                     video.get("publishedAt"), archived_at.isoformat(), digest)
+                ).lastrowid
+
+            self._conn.execute(
+                "INSERT INTO transcripts_fts (rowid, title, transcript) VALUES (?, ?, ?)",
+                (doc_id, video.get("title") or "", transcript)
+            )
+            self._conn.commit()
+            return True
+
+    def _document(self, row, with_transcript=False):
+        video_id, channel_id, channel_name, title, url, published_at, archived_at, digest = row
+        document = {
+            "video_id": video_id,
+            "channel_id": channel_id,
+            "channel_name": channel_name,
+            "title": title,
+            "url": url,
+            "publishedAt": published_at,
+            "archived_at": archived_at,
+        }
+        if with_transcript:
+            document["transcript"] = self._blob_text(digest)
+        return document
+
+    _COLUMNS = "d.video_id, d.channel_id, d.channel_name, d.title, d.url, d.published_at, d.archived_at, d.content_hash"
+
+    def get(self, video_id):
+        """Archived document including its transcript, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {self._COLUMNS} FROM documents d WHERE d.video_id = ?", (video_id,)
+            ).fetchone()
+            return self._document(row, with_transcript=True) if row else None
+
+    def search(self, query, since=None, channel_id=None, limit=50):
+        """
+        Full-text search (FTS5 query syntax, e.g. 'NVDA EPS' or '"rate cut"'), best match first.
+        `since` limits results to videos published at or after that datetime/ISO string.
+        """
+        sql = (
+            f"SELECT {self._COLUMNS} FROM transcripts_fts f JOIN documents d ON d.id = f.rowid "
+            "WHERE transcripts_fts MATCH ?"
+        )
+        params = [query]
+        if since is not None:
+            since = since.isoformat() if isinstance(since, datetime) else since
+            sql += " AND COALESCE(d.published_at, d.archived_at) >= ?"
+            params.append(since)
+        if channel_id:
+            sql += " AND d.channel_id = ?"
+            params.append(channel_id)
+        sql += " ORDER BY bm25(transcripts_fts) LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [self._document(row) for row in rows]
+
+    def video_ids(self):
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT video_id FROM documents ORDER BY archived_at")]
+
+    def export_txt(self, video_id, directory=EXPORT_DIR):
+        """Write one archived transcript in the per-file text format. Returns the filename or None."""
+        document = self.get(video_id)
+        if document is None:
+            return None
+        archived_at = datetime.fromisoformat(document["archived_at"])
+        filename = transcript_filename(document, archived_at, directory)
+        os.makedirs(directory, exist_ok=True)
+        with open(filename, "w", encoding="utf-8") as f:
+            f.write(render_transcript_file(document, document["transcript"], archived_at))
+        return filename
+
+    def import_txt(self, filename):
+        """Archive a transcript file written by earlier versions. Returns True if it was added."""
+        with open(filename, "r", encoding="utf-8") as f:
+            text = f.read()
+        header, _, body = text.partition("TRANSCRIPT:\n")
+        fields = dict(line.split(": ", 1) for line in header.splitlines() if ": " in line)
+        url = fields.get("URL", "")
+        match = re.search(r"v=([\w-]+)", url)
+        if not match:
+            return False
+
+        # File names are YYYYMMDD_ChannelName_VideoTitle.txt
+        parts = os.path.basename(filename).split("_", 2)
+        channel_name = parts[1] if len(parts) == 3 else ""
+        transcript = body.split("\n\n" + "=" * 50 + "\n", 1)[0]
+        video = {
+            "channel_id": fields.get("Channel ID", ""),
+            "channel_name": channel_name,
+            "title": fields.get("Title"),
+            "url": url,
+            "publishedAt": None,
+        }
+        try:
+            archived_at = datetime.strptime(fields.get("Date", ""), "%Y-%m-%d %H:%M")
+        except ValueError:
+            archived_at = None
+        return self.add(match.group(1), video, transcript, archived_at=archived_at)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search and export the transcript archive")
+    parser.add_argument("--archive", default=DEFAULT_ARCHIVE_FILE, help="archive database file")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    search_cmd = commands.add_parser("search", help="full-text search, e.g. search 'NVDA EPS' --days 30")
+    search_cmd.add_argument("query")
+    search_cmd.add_argument("--days", type=int, help="only videos published in the last N days")
+    search_cmd.add_argument("--channel", help="only this channel ID")
+    search_cmd.add_argument("--limit", type=int, default=50)
+
+    export_cmd = commands.add_parser("export", help="write transcripts in the per-file .txt format")
+    export_cmd.add_argument("video_ids", nargs="*", help="video IDs to export (default: all)")
+    export_cmd.add_argument("--dir", default=EXPORT_DIR)
+
+    import_cmd = commands.add_parser("import", help="archive existing transcript .txt files")
+    import_cmd.add_argument("--dir", default=EXPORT_DIR)
+
+    args = parser.parse_args()
+    archive = TranscriptArchive(args.archive)
+    try:
+        if args.command == "search":
+            since = datetime.now() - timedelta(days=args.days) if args.days else None
+            for document in archive.search(args.query, since=since, channel_id=args.channel, limit=args.limit):
+                print(f"{document['publishedAt'] or document['archived_at']}  {document['channel_name']}  "
+                      f"{document['title']}\n    {document['url']}")
+        elif args.command == "export":
+            for video_id in args.video_ids or archive.video_ids():
+                filename = archive.export_txt(video_id, args.dir)
+                print(f"📄 {filename}" if filename else f"⚠️ Not archived: {video_id}")
+        elif args.command == "import":
+            added = sum(
+                archive.import_txt(os.path.join(args.dir, name))
+                for name in sorted(os.listdir(args.dir)) if name.endswith(".txt")
+            ) if os.path.isdir(args.dir) else 0
+            print(f"📦 Archived {added} transcript files")
+    finally:
+        archive.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
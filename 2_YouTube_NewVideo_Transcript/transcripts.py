@@ -0,0 +1,217 @@
+import argparse
+import sqlite3
+import sys
+import threading
+import time
+from dataclasses import dataclass
+
+from youtube_transcript_api import YouTubeTranscriptApi
+from youtube_transcript_api._errors import NoTranscriptFound, TranscriptsDisabled, VideoUnavailable
+
+DEFAULT_LANGUAGES = ("ko", "en")
+DEFAULT_CHUNK_TOKENS = 800
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# How long a "no transcript" answer is trusted before the video is asked again.
+# Auto-generated captions often show up a few hours after upload, so a missing
+# transcript expires quickly; disabled captions and removed videos rarely change.
+NEGATIVE_TTLS = {
+    "no_transcript": 6 * HOUR,
+    "disabled": 7 * DAY,
+    "unavailable": 30 * DAY,
+}
+UNAVAILABLE_ERRORS = {
+    NoTranscriptFound: "no_transcript",
+    TranscriptsDisabled: "disabled",
+    VideoUnavailable: "unavailable",
+}
+
+
+@dataclass(frozen=True)
+class Segment:
+    text: str
+    start: float     # seconds from the start of the video
+    duration: float
+
+    @property
+    def end(self):
+        return self.start + self.duration
+
+
+@dataclass(frozen=True)
+class Chunk:
+    text: str
+    start: float
+    end: float
+    tokens: int
+
+
+class TranscriptUnavailable(Exception):
+    """The video has no transcript in the requested languages (possibly known from the negative cache)."""
+
+    def __init__(self, video_id, reason, message="", cached=False):
+        super().__init__(message or f"{reason} ({video_id})")
+        self.video_id = video_id
+        self.reason = reason
+        self.cached = cached
+
+
+class NegativeCache:
+    """
+    TTL'd record of (video, languages) pairs known to have no transcript.
+
+    Lives in a table next to the seen-video store, so every run (and every
+    worker thread) skips videos that were just found to have no transcript.
+    """
+
+    def __init__(self, path="videos.db", ttls=None):
+        self.ttls = dict(NEGATIVE_TTLS, **(ttls or {}))
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS transcript_unavailable (
+                video_id TEXT NOT NULL,
+                languages TEXT NOT NULL,
+                reason TEXT NOT NULL,
+                message TEXT,
+                checked_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                PRIMARY KEY (video_id, languages)
+            )
+        """)
+        self._conn.commit()
+
+    def get(self, video_id, languages):
+        """(reason, message) if the video is known to have no transcript, else None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT reason, message FROM transcript_unavailable "
+                "WHERE video_id = ? AND languages = ? AND expires_at > ?",
+                (video_id, ",".join(languages), time.time())
+            ).fetchone()
+        return row
+
+    def put(self, video_id, languages, reason, message=""):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO transcript_unavailable "
+                "(video_id, languages, reason, message, checked_at, expires_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (video_id, ",".join(languages), reason, message, now, now + self.ttls[reason])
+            )
+            self._conn.commit()
+
+    def purge_expired(self):
+        with self._lock:
+            deleted = self._conn.execute(
+                "DELETE FROM transcript_unavailable WHERE expires_at <= ?", (time.time(),)
+            ).rowcount
+            self._conn.commit()
+        return deleted
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def _fetch_entries(video_id, languages):
+    """Raw transcript entries from whichever youtube-transcript-api version is installed."""
+    if hasattr(YouTubeTranscriptApi, "get_transcript"):
+        # 0.x: class method returning a list of {"text", "start", "duration"} dicts
+        for entry in YouTubeTranscriptApi.get_transcript(video_id, languages=list(languages)):
+            yield entry["text"], entry["start"], entry["duration"]
+    else:
+        # 1.x: instance API returning snippet objects
+        for snippet in YouTubeTranscriptApi().fetch(video_id, languages=list(languages)):
+            yield snippet.text, snippet.start, snippet.duration
+
+
+def iter_segments(video_id, languages=DEFAULT_LANGUAGES, negative_cache=None):
+    """
+    Yield the transcript of `video_id` as timestamped Segments, in order.
+
+    Raises TranscriptUnavailable when the video has no transcript in
+    `languages`; that answer is remembered in `negative_cache` (if given) and
+    returned from there, without a request, until it expires. Other errors
+    (network, rate limiting) are raised as-is and never cached.
+    """
+    languages = tuple(languages)
+    if negative_cache is not None:
+        cached = negative_cache.get(video_id, languages)
+        if cached:
+            raise TranscriptUnavailable(video_id, cached[0], cached[1], cached=True)
+
+    try:
+        entries = _fetch_entries(video_id, languages)
+        first = next(entries, None)
+    except tuple(UNAVAILABLE_ERRORS) as e:
+        reason = next(reason for error, reason in UNAVAILABLE_ERRORS.items() if isinstance(e, error))
+        if negative_cache is not None:
+            negative_cache.put(video_id, languages, reason, str(e))
+        raise TranscriptUnavailable(video_id, reason, str(e)) from e
+
+    if first is None:
+        return
+    yield Segment(*first)
+    for entry in entries:
+        yield Segment(*entry)
+
+
+def estimate_tokens(text):
+    """Rough token count (~4 UTF-8 bytes per token), good enough for sizing prompts in Korean and English."""
+    return max(1, len(text.encode("utf-8")) // 4)
+
+
+def chunk_segments(segments, max_tokens=DEFAULT_CHUNK_TOKENS, count_tokens=estimate_tokens):
+    """
+    Group segments into Chunks of at most `max_tokens` (by `count_tokens`),
+    breaking only between segments. Works lazily on any segment iterable.
+    """
+    texts, tokens, start, end = [], 0, None, None
+    for segment in segments:
+        text = segment.text.strip()
+        if not text:
+            continue
+        size = count_tokens(text)
+        if texts and tokens + size > max_tokens:
+            yield Chunk(" ".join(texts), start, end, tokens)
+            texts, tokens, start = [], 0, None
+        if start is None:
+            start = segment.start
+        texts.append(text)
+        tokens += size
+        end = segment.end
+    if texts:
+        yield Chunk(" ".join(texts), start, end, tokens)
+
+
+def transcript_text(segments):
+    return " ".join(segment.text for segment in segments)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print a video transcript as timestamped segments or chunks")
+    parser.add_argument("video_id")
+    parser.add_argument("--languages", default=",".join(DEFAULT_LANGUAGES), help="comma-separated, in preference order")
+    parser.add_argument("--chunks", type=int, metavar="TOKENS", help="print chunks of at most TOKENS tokens")
+    args = parser.parse_args()
+
+    segments = iter_segments(args.video_id, args.languages.split(","))
+    try:
+        if args.chunks:
+            for chunk in chunk_segments(segments, args.chunks):
+                print(f"[{chunk.start:8.1f}s - {chunk.end:8.1f}s] ({chunk.tokens} tokens)\n{chunk.text}\n")
+        else:
+            for segment in segments:
+                print(f"[{segment.start:8.1f}s] {segment.text}")
+    except TranscriptUnavailable as e:
+        print(f"⚠️ {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
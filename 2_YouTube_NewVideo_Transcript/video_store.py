@@ -0,0 +1,156 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+STATUS_NEW = "new"              # detected, transcript not fetched yet
+STATUS_PROCESSED = "processed"  # transcript fetched and saved
+STATUS_FAILED = "failed"        # transcript fetch failed
+STATUS_SKIPPED = "skipped"      # seen while establishing a channel baseline, never processed
+STATUS_LEGACY = "legacy"        # imported from history.json
+
+DEFAULT_DB_FILE = "videos.db"
+
+
+class VideoStore:
+    """
+    Indexed store of every video seen, backed by SQLite in WAL mode.
+
+    Membership checks are primary-key lookups, every change is committed on
+    its own (so a crash never loses more than the video in flight), and the
+    (channel_id, published_at) index keeps per-channel lookups fast no matter
+    how many rows accumulate.
+    """
+
+    def __init__(self, path=DEFAULT_DB_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS videos (
+                video_id TEXT PRIMARY KEY,
+                channel_id TEXT NOT NULL,
+                channel_name TEXT,
+                title TEXT,
+                url TEXT,
+                published_at TEXT,
+                status TEXT NOT NULL,
+                first_seen TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_videos_channel_published ON videos (channel_id, published_at)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_videos_status ON videos (status)")
+        self._conn.commit()
+
+    def is_seen(self, video_id):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM videos WHERE video_id = ?", (video_id,)
+            ).fetchone() is not None
+
+    def seen_ids(self, video_ids):
+        """Subset of `video_ids` already in the store."""
+        video_ids = list(video_ids)
+        if not video_ids:
+            return set()
+        with self._lock:
+            placeholders = ",".join("?" * len(video_ids))
+            rows = self._conn.execute(
+                f"SELECT video_id FROM videos WHERE video_id IN ({placeholders})", video_ids
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def has_channel(self, channel_id):
+        """True once any non-legacy video of the channel has been recorded."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM videos WHERE channel_id = ? AND status != ? LIMIT 1",
+                (channel_id, STATUS_LEGACY)
+            ).fetchone() is not None
+
+    def add(self, video_id, video, status=STATUS_NEW):
+        """Record a video. Returns False if it was already known."""
+        now = datetime.now().isoformat()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO videos "
+                "(video_id, channel_id, channel_name, title, url, published_at, status, first_seen, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (video_id, video["channel_id"], video.get("channel_name"), video.get("title"),
+                 video.get("url"), video.get("publishedAt"), status, now, now)
+            )
+            self._conn.commit()
+            return cursor.rowcount == 1
+
+    def set_status(self, video_id, status):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE videos SET status = ?, updated_at = ? WHERE video_id = ?",
+                (status, datetime.now().isoformat(), video_id)
+            )
+            self._conn.commit()
+
+    def _video(self, row):
+        video_id, channel_id, channel_name, title, url, published_at, status = row
+        return {
+            "video_id": video_id,
+            "channel_id": channel_id,
+            "channel_name": channel_name,
+            "title": title,
+            "url": url,
+            "publishedAt": published_at,
+            "status": status
+        }
+
+    def pending(self):
+        """Videos detected by an earlier run whose transcript was never saved (e.g. after a crash)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT video_id, channel_id, channel_name, title, url, published_at, status "
+                "FROM videos WHERE status = ?", (STATUS_NEW,)
+            ).fetchall()
+        return [self._video(row) for row in rows]
+
+    def failed(self, since=None):
+        """Videos whose transcript fetch failed, optionally only those published at or after `since`."""
+        sql = ("SELECT video_id, channel_id, channel_name, title, url, published_at, status "
+               "FROM videos WHERE status = ?")
+        params = [STATUS_FAILED]
+        if since is not None:
+            sql += " AND published_at >= ?"
+            params.append(since)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [self._video(row) for row in rows]
+
+    def latest_for_channel(self, channel_id, limit=1):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT video_id, channel_id, channel_name, title, url, published_at, status "
+                "FROM videos WHERE channel_id = ? AND published_at IS NOT NULL "
+                "ORDER BY published_at DESC LIMIT ?", (channel_id, limit)
+            ).fetchall()
+        return [self._video(row) for row in rows]
+
+    def import_history_json(self, path="history.json"):
+        """One-time migration of the old {channel_id: latest_video_id} history file."""
+        if not os.path.exists(path):
+            return 0
+        with open(path, "r", encoding="utf-8") as f:
+            history = json.load(f)
+        imported = 0
+        for channel_id, video_id in history.items():
+            if video_id and self.add(video_id, {"channel_id": channel_id}, status=STATUS_LEGACY):
+                imported += 1
+        os.replace(path, f"{path}.migrated")
+        return imported
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
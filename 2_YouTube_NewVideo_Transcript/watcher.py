@@ -0,0 +1,241 @@
+import os
+import re
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta, timezone
+
+from youtube_api import (
+    DETECTION_BACKEND, MAX_IDS_PER_CALL, get_recent_videos, get_uploads_playlists, get_videos, is_published
+)
+from video_store import STATUS_FAILED, STATUS_NEW, STATUS_PROCESSED, STATUS_SKIPPED, VideoStore
+from transcript_archive import TranscriptArchive
+from transcripts import NegativeCache, TranscriptUnavailable, iter_segments, transcript_text
+
+# Concurrency limits per pipeline stage
+POLL_CONCURRENCY = int(os.getenv("POLL_CONCURRENCY", "8"))
+TRANSCRIPT_CONCURRENCY = int(os.getenv("TRANSCRIPT_CONCURRENCY", "4"))
+# Uploads looked at per channel per poll, so several uploads between polls are all caught
+RECENT_VIDEOS_PER_POLL = int(os.getenv("RECENT_VIDEOS_PER_POLL", "5"))
+# Also write each transcript to transcripts/ as a .txt file (they can be exported from the archive any time)
+SAVE_TRANSCRIPT_FILES = os.getenv("SAVE_TRANSCRIPT_FILES", "0") == "1"
+# Confirm new videos with videos.list (1 unit per 50) and hold back upcoming/live streams.
+# Off by default for the quota-free feed backend, which needs no API key
+CONFIRM_NEW_VIDEOS = os.getenv("CONFIRM_NEW_VIDEOS", "0" if DETECTION_BACKEND == "feed" else "1") == "1"
+# Videos whose transcript failed are retried for this many days after publishing
+RETRY_FAILED_DAYS = int(os.getenv("RETRY_FAILED_DAYS", "3"))
+
+TRANSCRIPT_LANGUAGES = ["ko", "en"]
+
+
+def load_channel_ids(path="channel_ids.txt"):
+    """Channel IDs to monitor, one per line."""
+    with open(path, "r") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def extract_video_id(url):
+    """Extract video ID from YouTube URL (e.g., 'dQw4w9WgXcQ' from full URL)"""
+    match = re.search(r"v=([\w-]+)", url)
+    return match.group(1) if match else None
+
+
+def is_transcript_error(transcript):
+    return transcript.startswith("[Transcript Error")
+
+
+class YouTubeWatcher:
+    """
+    Detects new uploads and archives their transcripts.
+
+    `poll()` checks the given channels in parallel. New videos are confirmed
+    with videos.list in batches of up to 50 per poll, dropping upcoming and
+    live streams (they are found again once they are published), and their
+    transcripts are fetched on a second, smaller pool. Every video is committed
+    to the seen-video store before its transcript is fetched, so an interrupted
+    poll is picked up by the next one.
+    """
+
+    def __init__(self, store=None, archive=None, negative_cache=None,
+                 poll_concurrency=POLL_CONCURRENCY, transcript_concurrency=TRANSCRIPT_CONCURRENCY,
+                 recent_per_poll=RECENT_VIDEOS_PER_POLL, save_transcript_files=SAVE_TRANSCRIPT_FILES,
+                 retry_failed_days=RETRY_FAILED_DAYS, confirm_new_videos=CONFIRM_NEW_VIDEOS,
+                 history_file="history.json"):
+        self.store = store or VideoStore()
+        if history_file:
+            self.store.import_history_json(history_file)
+        # Videos known to have no transcript are not asked again until their entry expires
+        self.negative_cache = negative_cache or NegativeCache(self.store.path)
+        self.archive = archive or TranscriptArchive()
+        self.poll_concurrency = poll_concurrency
+        self.transcript_concurrency = transcript_concurrency
+        self.recent_per_poll = recent_per_poll
+        self.save_transcript_files = save_transcript_files
+        self.retry_failed_days = retry_failed_days
+        self.confirm_new_videos = confirm_new_videos
+        self._retry_pending = True
+
+    def get_transcript(self, video_url):
+        """Transcript text in Korean or English, or an "[Transcript Error...]" message."""
+        video_id = extract_video_id(video_url)
+        try:
+            return transcript_text(iter_segments(video_id, TRANSCRIPT_LANGUAGES, negative_cache=self.negative_cache))
+        except TranscriptUnavailable as e:
+            cached = " (cached)" if e.cached else ""
+            return f"[Transcript Error{cached}: {e.reason}]"
+        except Exception as e:
+            return f"[Transcript Error: {str(e)}]"
+
+    def select_new_videos(self, channel_id, videos):
+        """
+        Pick the videos to process from a channel's recent uploads (newest first).
+        The first time a channel is polled only uploads newer than its history.json
+        entry (or just the newest one) are processed; the rest are marked skipped.
+        """
+        video_ids = [extract_video_id(video["url"]) for video in videos]
+        seen = self.store.seen_ids(video_ids)
+
+        if self.store.has_channel(channel_id):
+            return [(video, video_id) for video, video_id in zip(videos, video_ids) if video_id not in seen]
+
+        cutoff = next((i for i, video_id in enumerate(video_ids) if video_id in seen), 1)
+        for video, video_id in zip(videos[cutoff:], video_ids[cutoff:]):
+            self.store.add(video_id, video, status=STATUS_SKIPPED)
+        return list(zip(videos[:cutoff], video_ids[:cutoff]))
+
+    @staticmethod
+    def confirm_videos(candidates):
+        """
+        Look up (channel_id, video, video_id) candidates with one videos.list call
+        per 50 and keep those that are published, with the API's publish time and
+        channel title.
+        """
+        details = get_videos([video_id for _, _, video_id in candidates])
+        confirmed = []
+        for channel_id, video, video_id in candidates:
+            item = details.get(video_id)
+            if item is None or not is_published(item):
+                continue
+            video["publishedAt"] = item["snippet"].get("publishedAt", video.get("publishedAt"))
+            video["channel_name"] = item["snippet"].get("channelTitle", video["channel_name"])
+            confirmed.append((channel_id, video, video_id))
+        return confirmed
+
+    def record_new_video(self, channel_id, video, video_id, transcript):
+        """Archive a fetched transcript and update the video's status. Returns the new-video record."""
+        now = datetime.now()
+        record = {
+            "video_id": video_id,
+            "timestamp": now.isoformat(),
+            "url": video["url"],
+            "title": video["title"],
+            "channel_id": channel_id,
+            "channel_name": video["channel_name"],
+            "publishedAt": video.get("publishedAt"),
+            "transcript": transcript,
+        }
+
+        print(f"✅ New video detected: {video['title']}")
+        print(f"📺 Channel: {video['channel_name']}")
+
+        if is_transcript_error(transcript):
+            print(f"⚠️ {transcript}")
+            self.store.set_status(video_id, STATUS_FAILED)
+            return record
+
+        self.archive.add(video_id, {**video, "channel_id": channel_id}, transcript, archived_at=now)
+        print(f"📦 Transcript archived: {video_id}")
+        if self.save_transcript_files:
+            print(f"📄 Transcript saved: {self.archive.export_txt(video_id)}")
+        self.store.set_status(video_id, STATUS_PROCESSED)
+        return record
+
+    def _retry_candidates(self):
+        """Videos left pending by an interrupted run, and recent videos whose transcript failed."""
+        since = (datetime.now(timezone.utc) - timedelta(days=self.retry_failed_days)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        return self.store.pending() + self.store.failed(since=since)
+
+    def poll(self, channel_ids, retry=None):
+        """
+        Check `channel_ids` for new uploads and fetch their transcripts.
+        Pending/failed videos are retried on the first poll (or when `retry` is True).
+        Returns the new-video records in the order they finished.
+        """
+        if retry is None:
+            retry, self._retry_pending = self._retry_pending, False
+        if DETECTION_BACKEND == "playlist":
+            # One channels.list call per 50 unknown channels, then cached
+            get_uploads_playlists(channel_ids)
+
+        new_videos = []
+        with ThreadPoolExecutor(max_workers=self.poll_concurrency) as poll_pool, \
+                ThreadPoolExecutor(max_workers=self.transcript_concurrency) as transcript_pool:
+            poll_jobs = {
+                poll_pool.submit(get_recent_videos, channel_id, self.recent_per_poll): channel_id
+                for channel_id in channel_ids
+            }
+            confirm_jobs = {}
+            transcript_jobs = {}
+            pending = set(poll_jobs)
+            polls_left = len(poll_jobs)
+            unconfirmed = []
+
+            def start_transcripts(candidates):
+                for channel_id, video, video_id in candidates:
+                    # Committed before the fetch, so a crash leaves it pending for the next run
+                    self.store.add(video_id, video, status=STATUS_NEW)
+                    job = transcript_pool.submit(self.get_transcript, video["url"])
+                    transcript_jobs[job] = (channel_id, video, video_id, False)
+                    pending.add(job)
+
+            for video in self._retry_candidates() if retry else []:
+                job = transcript_pool.submit(self.get_transcript, video["url"])
+                transcript_jobs[job] = (video["channel_id"], video, video["video_id"], video["status"] == STATUS_FAILED)
+                pending.add(job)
+
+            # All store/archive writes happen on this thread
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    if future in poll_jobs:
+                        channel_id = poll_jobs[future]
+                        polls_left -= 1
+                        try:
+                            videos = future.result()
+                        except Exception as e:
+                            print(f"⚠️ Failed to check channel {channel_id}: {e}")
+                            videos = []
+
+                        candidates = [(channel_id, video, video_id)
+                                      for video, video_id in self.select_new_videos(channel_id, videos)]
+                        if not self.confirm_new_videos:
+                            start_transcripts(candidates)
+                            continue
+                        unconfirmed.extend(candidates)
+                        # Full batches go out right away; the rest once every channel has been polled
+                        while len(unconfirmed) >= MAX_IDS_PER_CALL or (unconfirmed and not polls_left):
+                            batch, unconfirmed = unconfirmed[:MAX_IDS_PER_CALL], unconfirmed[MAX_IDS_PER_CALL:]
+                            job = poll_pool.submit(self.confirm_videos, batch)
+                            confirm_jobs[job] = batch
+                            pending.add(job)
+                    elif future in confirm_jobs:
+                        batch = confirm_jobs.pop(future)
+                        try:
+                            start_transcripts(future.result())
+                        except Exception as e:
+                            # Left out of the store, so the next poll finds them again
+                            print(f"⚠️ Failed to confirm {len(batch)} new videos: {e}")
+                    else:
+                        channel_id, video, video_id, retried = transcript_jobs.pop(future)
+                        transcript = future.result()
+                        # A retried video that still has no transcript was already reported
+                        if retried and is_transcript_error(transcript):
+                            continue
+                        new_videos.append(self.record_new_video(channel_id, video, video_id, transcript))
+
+        return new_videos
+
+    def close(self):
+        self.negative_cache.purge_expired()
+        self.negative_cache.close()
+        self.store.close()
+        self.archive.close()
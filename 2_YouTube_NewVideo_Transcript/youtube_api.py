@@ -1,30 +1,239 @@
-import requests
+import json
 import os
+import threading
+import time
+import xml.etree.ElementTree as ET
 from dotenv import load_dotenv
 
+from common.http_client import get_client
+
 load_dotenv()
 API_KEY = os.getenv("YOUTUBE_API_KEY")
-SEARCH_URL = "https://www.googleapis.com/youtube/v3/search"
+# Base URLs can point at a local stand-in server (see benchmarks/)
+API_BASE = os.getenv("YOUTUBE_API_BASE", "https://www.googleapis.com/youtube/v3")
+SEARCH_URL = f"{API_BASE}/search"
+CHANNELS_URL = f"{API_BASE}/channels"
+PLAYLIST_ITEMS_URL = f"{API_BASE}/playlistItems"
+VIDEOS_URL = f"{API_BASE}/videos"
+FEED_URL = os.getenv("YOUTUBE_FEED_URL", "https://www.youtube.com/feeds/videos.xml")
+
+# How new uploads are detected (quota cost per channel per run):
+#   "playlist" - uploads playlist via playlistItems.list (1 unit)
+#   "feed"     - public channel RSS feed (no API quota)
+#   "search"   - search.list ordered by date (100 units, legacy behaviour)
+DETECTION_BACKEND = os.getenv("YOUTUBE_DETECTION_BACKEND", "playlist")
+UPLOADS_CACHE_FILE = "uploads_playlists.json"
+UPLOADS_MISSING_TTL = 24 * 60 * 60  # channels without an uploads playlist are looked up again after a day
+MAX_IDS_PER_CALL = 50  # channels.list / videos.list accept up to 50 IDs
+
+ATOM_NS = {
+    "atom": "http://www.w3.org/2005/Atom",
+    "yt": "http://www.youtube.com/xml/schemas/2015",
+}
+
+_uploads_lock = threading.Lock()
+_uploads_cache = None
+
+
+def _chunks(items, size=MAX_IDS_PER_CALL):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _video_dict(channel_id, channel_name, title, published_at, video_id):
+    return {
+        "channel_id": channel_id,
+        "channel_name": channel_name,
+        "title": title,
+        "publishedAt": published_at,
+        "url": f"https://www.youtube.com/watch?v={video_id}"
+    }
+
+
+# === Uploads playlist IDs (cached per channel) ===
+def _load_uploads_cache():
+    """{"playlists": {channel_id: playlist_id}, "missing": {channel_id: expires_at}}"""
+    global _uploads_cache
+    if _uploads_cache is None:
+        if os.path.exists(UPLOADS_CACHE_FILE):
+            with open(UPLOADS_CACHE_FILE, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            # Older files are a flat {channel_id: playlist_id} map
+            _uploads_cache = data if "playlists" in data else {"playlists": data, "missing": {}}
+        else:
+            _uploads_cache = {"playlists": {}, "missing": {}}
+    return _uploads_cache
+
+
+def _save_uploads_cache():
+    tmp = f"{UPLOADS_CACHE_FILE}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(_uploads_cache, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, UPLOADS_CACHE_FILE)
+
+
+def get_uploads_playlists(channel_ids):
+    """
+    Map channel IDs to their uploads playlist IDs.
+    Unknown channels are looked up with channels.list, 50 IDs per call (1 unit each),
+    and the result is cached in uploads_playlists.json. Channels a successful
+    response does not return (deleted or invalid IDs) are left out and not asked
+    again for UPLOADS_MISSING_TTL seconds; a failed call caches nothing.
+    """
+    now = time.time()
+    with _uploads_lock:
+        cache = _load_uploads_cache()
+        missing = [
+            channel_id for channel_id in dict.fromkeys(channel_ids)
+            if channel_id not in cache["playlists"] and cache["missing"].get(channel_id, 0) <= now
+        ]
+
+    # The network calls run outside the lock so other pollers can read the cache meanwhile
+    found = {}
+    answered = []  # IDs whose chunk got a valid response; only these can be cached as missing
+    for chunk in _chunks(missing):
+        params = {
+            "part": "contentDetails",
+            "id": ",".join(chunk),
+            "maxResults": MAX_IDS_PER_CALL,
+            "key": API_KEY
+        }
+        try:
+            res = get_client().get(CHANNELS_URL, params=params)
+        except Exception as e:
+            res = None
+            data = {"error": str(e)}
+        else:
+            try:
+                data = res.json()
+            except ValueError:
+                data = {}
+        if res is None or not res.ok or "error" in data:
+            # Quota, key or server errors say nothing about the channels: ask again next time
+            error = data.get("error") or (res.status_code if res is not None else "no response")
+            reason = error.get("message", error) if isinstance(error, dict) else error
+            print(f"⚠️ channels.list failed for {len(chunk)} channels: {reason}")
+            continue
+        answered.extend(chunk)
+        for item in data.get("items", []):
+            found[item["id"]] = item["contentDetails"]["relatedPlaylists"]["uploads"]
+
+    with _uploads_lock:
+        if answered:
+            cache["playlists"].update(found)
+            for channel_id in answered:
+                if channel_id in found:
+                    cache["missing"].pop(channel_id, None)
+                else:
+                    cache["missing"][channel_id] = now + UPLOADS_MISSING_TTL
+            _save_uploads_cache()
+        playlists = cache["playlists"]
+        return {channel_id: playlists[channel_id] for channel_id in channel_ids if channel_id in playlists}
+
+
+# === Detection backends ===
+def _recent_from_playlist(channel_id, max_results):
+    playlist_id = get_uploads_playlists([channel_id]).get(channel_id)
+    if not playlist_id:
+        return []
 
-def get_latest_video(channel_id):
+    params = {
+        "part": "snippet,contentDetails",
+        "playlistId": playlist_id,
+        "maxResults": max_results,
+        "key": API_KEY
+    }
+    data = get_client().get(PLAYLIST_ITEMS_URL, params=params).json()
+    videos = []
+    for item in data.get("items", []):
+        # Scheduled premieres/private videos have no publish time yet
+        published_at = item["contentDetails"].get("videoPublishedAt")
+        if not published_at:
+            continue
+        videos.append(_video_dict(
+            channel_id,
+            item["snippet"].get("videoOwnerChannelTitle") or item["snippet"]["channelTitle"],
+            item["snippet"]["title"],
+            published_at,
+            item["contentDetails"]["videoId"]
+        ))
+    return videos
+
+
+def _recent_from_feed(channel_id, max_results):
+    res = get_client().get(FEED_URL, params={"channel_id": channel_id})
+    if res.status_code != 200:
+        return []
+    root = ET.fromstring(res.content)
+    return [
+        _video_dict(
+            channel_id,
+            entry.findtext("atom:author/atom:name", default="", namespaces=ATOM_NS),
+            entry.findtext("atom:title", default="", namespaces=ATOM_NS),
+            entry.findtext("atom:published", default="", namespaces=ATOM_NS),
+            entry.findtext("yt:videoId", namespaces=ATOM_NS)
+        )
+        for entry in root.findall("atom:entry", ATOM_NS)[:max_results]
+    ]
+
+
+def _recent_from_search(channel_id, max_results):
     params = {
         "part": "snippet",
         "channelId": channel_id,
         "order": "date",
-        "maxResults": 1,
+        "maxResults": max_results,
         "type": "video",
         "key": API_KEY
     }
-    res = requests.get(SEARCH_URL, params=params)
+    res = get_client().get(SEARCH_URL, params=params)
     data = res.json()
-    items = data.get("items", [])
-    if not items:
-        return None
-    video = items[0]
-    return {
-        "channel_id": channel_id,
-        "channel_name": video["snippet"]["channelTitle"],
-        "title": video["snippet"]["title"],
-        "publishedAt": video["snippet"]["publishedAt"],
-        "url": f"https://www.youtube.com/watch?v={video['id']['videoId']}"
-    }
+    return [
+        _video_dict(
+            channel_id,
+            video["snippet"]["channelTitle"],
+            video["snippet"]["title"],
+            video["snippet"]["publishedAt"],
+            video["id"]["videoId"]
+        )
+        for video in data.get("items", [])
+    ]
+
+
+BACKENDS = {
+    "playlist": _recent_from_playlist,
+    "feed": _recent_from_feed,
+    "search": _recent_from_search,
+}
+
+
+def get_recent_videos(channel_id, max_results=5):
+    """Most recent uploads of a channel (newest first) using DETECTION_BACKEND. Same quota cost as one video."""
+    return BACKENDS[DETECTION_BACKEND](channel_id, max_results)
+
+
+def get_latest_video(channel_id):
+    """Latest upload of a channel using DETECTION_BACKEND, or None."""
+    videos = get_recent_videos(channel_id, max_results=1)
+    return videos[0] if videos else None
+
+
+def get_videos(video_ids):
+    """Fetch video snippets with videos.list, 50 IDs per call (1 unit each). Returns {video_id: item}."""
+    videos = {}
+    for chunk in _chunks(list(dict.fromkeys(video_ids))):
+        params = {
+            "part": "snippet",
+            "id": ",".join(chunk),
+            "maxResults": MAX_IDS_PER_CALL,
+            "key": API_KEY
+        }
+        data = get_client().get(VIDEOS_URL, params=params).json()
+        for item in data.get("items", []):
+            videos[item["id"]] = item
+    return videos
+
+
+def is_published(item):
+    """False for upcoming/ongoing live streams and premieres, which have no transcript yet."""
+    return item["snippet"].get("liveBroadcastContent", "none") == "none"
@@ -0,0 +1,75 @@
+"""
+📒 CHECKPOINT JOURNAL
+Append-only JSONL journals so an interrupted scrape resumes where it stopped
+"""
+
+import glob
+import json
+import os
+import threading
+import time
+
+JOURNAL_PATTERN = "*.jsonl"
+DEFAULT_MAX_AGE = 24 * 3600  # ignore checkpoints left over from an older run
+
+
+class CheckpointJournal:
+    """
+    Thread-safe JSONL journal of completed ticker records.
+
+    Every record is flushed and fsynced as soon as it is written, so a crash
+    loses at most the ticker that was in flight.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def append(self, record: dict):
+        line = json.dumps(dict(record, checkpointed_at=time.time()), ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_checkpoints(directory: str, max_age: float = DEFAULT_MAX_AGE) -> dict:
+    """
+    Read every journal in `directory` and return {ticker: record}.
+    Later lines win, and a truncated final line from a crash is skipped.
+    """
+    completed = {}
+    cutoff = time.time() - max_age
+
+    for path in sorted(glob.glob(os.path.join(directory, JOURNAL_PATTERN))):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if record.pop('checkpointed_at', 0) < cutoff:
+                    continue
+                completed[record['Ticker']] = record
+
+    return completed
+
+
+def clear_checkpoints(directory: str):
+    """Remove all journals once a run has been exported successfully."""
+    for path in glob.glob(os.path.join(directory, JOURNAL_PATTERN)):
+        os.remove(path)
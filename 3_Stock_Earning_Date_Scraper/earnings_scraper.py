@@ -5,39 +5,90 @@ Scrapes earnings calendar data using Yahoo Finance with multiple fallback method
 Author: AI Assistant
 """
 
-import yfinance as yf
-import pandas as pd
+from __future__ import annotations
+
 import logging
 from datetime import datetime, timedelta
-import time
 import os
-import requests
+import sys
 import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import TYPE_CHECKING
+
+from checkpoint import CheckpointJournal, clear_checkpoints, load_checkpoints
+from exporters import EXPORTERS, ExportState, get_exporter
+from metrics import ScraperMetrics
+from source_planner import SourcePlanner
+from rate_limiter import TokenBucket
+from response_cache import ResponseCache
+from universe import load_tickers, split_shards
+
+# pandas, yfinance, openpyxl and requests are imported on the code paths that use them,
+# so importing this module, --help and --dry-run stay fast and never touch the network stack
+if TYPE_CHECKING:
+    import pandas as pd
 
 # ===============================================================================
 # 🔧 CONFIGURATION
 # ===============================================================================
 
 TICKERS = ["NVDA", "MSFT", "AAPL", "GOOGL", "META", "NFLX", "SPOT", "PLTR", "AVGO", "HOOD", "RKLB", "ORCL", "TSLA", "AEVA"]
-print(f"📊 Total tickers to process: {len(TICKERS)}\n\n")
 OUTPUT_DIR = "output"
 OUTPUT_FILE = f"{OUTPUT_DIR}/earnings_calendar.xlsx"
-RATE_LIMIT_DELAY = 1  # seconds between API calls
+CHECKPOINT_DIR = f"{OUTPUT_DIR}/checkpoints"  # per-run journals for resuming interrupted scrapes
+METRICS_FILE = f"{OUTPUT_DIR}/metrics.json"
+PROFILE_FILE = f"{OUTPUT_DIR}/profile.prof"
+LOG_FILE = "earnings_scraper.log"
+HISTORY_DIR = f"{OUTPUT_DIR}/history"  # every run's records, for diffs between runs (see snapshot_history.py)
+MAX_WORKERS = 8  # concurrent ticker fetches
+# The limit counts remote calls, not tickers: an uncached ticker costs about 3
+# calls (API + calendar/info/quarterly fallbacks), so 6 calls/s is ~2 tickers/s
+RATE_LIMIT_PER_SEC = 6.0  # average remote calls/sec shared by all workers
+RATE_LIMIT_BURST = 12  # calls allowed back-to-back before throttling
+CACHE_FILE = "cache/earnings_cache.sqlite"  # set to None to disable the response cache
+API_BATCH_SIZE = 50  # symbols per batched earnings calendar request
+PLANNER_FILE = "cache/source_stats.sqlite"  # set to None to always walk the full fallback chain
+YAHOO_QUERY_URL = os.getenv("YAHOO_QUERY_URL", "https://query1.finance.yahoo.com")  # override to use a local stand-in
+
+FETCH_FIELDS = ('next_earnings_date', 'last_reported_eps', 'eps_estimate', 'fiscal_quarter')
+
+EMPTY_API_DATA = {
+    'eps_estimate': 'N/A',
+    'quarter': 'N/A',
+    'year': 'N/A',
+    'earnings_date': 'N/A'
+}
 
 # ===============================================================================
 # 🔧 LOGGING SETUP
 # ===============================================================================
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('earnings_scraper.log'),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
+# yfinance, imported on first use; tests and benchmarks may assign a stand-in
+yf = None
+
+
+def _yfinance():
+    global yf
+    if yf is None:
+        import yfinance
+        yf = yfinance
+    return yf
+
+
+def setup_logging(log_file: str = LOG_FILE, level: int = logging.INFO):
+    """Log to the console and `log_file` (None for console only). Called by main(), never on import."""
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        handlers.append(logging.FileHandler(log_file))
+    logging.basicConfig(
+        level=level,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=handlers
+    )
+
 # ===============================================================================
 # 📊 EARNINGS SCRAPER CLASS
 # ===============================================================================
@@ -45,8 +96,74 @@ logger = logging.getLogger(__name__)
 class EarningsScraper:
     """Comprehensive earnings scraper using Yahoo Finance with multiple fallback methods."""
     
-    def __init__(self):
-        logger.info("Earnings scraper initialized")
+    def __init__(self, max_workers: int = MAX_WORKERS,
+                 requests_per_second: float = RATE_LIMIT_PER_SEC,
+                 burst: int = RATE_LIMIT_BURST,
+                 cache_file: str = CACHE_FILE,
+                 planner_file: str = PLANNER_FILE):
+        self.max_workers = max(1, max_workers)
+        self.rate_limiter = TokenBucket(requests_per_second, burst)
+        self.cache = ResponseCache(cache_file) if cache_file else None
+        self.planner = SourcePlanner(planner_file) if planner_file else None
+        self.metrics = ScraperMetrics()
+        logger.info(f"Earnings scraper initialized "
+                    f"(workers={self.max_workers}, rate={requests_per_second}/s, burst={burst}, "
+                    f"cache={cache_file or 'off'})")
+    
+    def _remote(self, symbol: str, source: str, fetch):
+        """
+        Return a cached response for (symbol, source), or call `fetch` under the
+        shared rate limiter and cache the result. Every remote call takes one
+        token, so the limit is in calls/sec. Failed fetches are not cached, and
+        empty results are only cached briefly (see ResponseCache).
+        """
+        def limited_fetch():
+            self.rate_limiter.acquire()
+            return fetch()
+        
+        if self.cache is None:
+            return limited_fetch()
+        return self.cache.get_or_fetch(symbol, source, limited_fetch)
+    
+    def _request_earnings_calendar(self, symbols: list) -> dict:
+        """
+        Fetch the Yahoo Finance earnings calendar for one or more symbols and
+        index the result rows by ticker.
+        """
+        # Yahoo Finance earnings calendar endpoint (accepts a comma-separated symbol list)
+        url = f"{YAHOO_QUERY_URL}/v7/finance/calendar/earnings"
+        params = {
+            'symbol': ','.join(symbols),
+            'formatted': 'true',
+            'crumb': 'dummy',
+            'lang': 'en-US',
+            'region': 'US',
+            'corsDomain': 'finance.yahoo.com'
+        }
+        
+        headers = {
+            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+        }
+        
+        from common.http_client import get_client
+
+        # One token per attempt: the client's retries count against the limit too
+        response = get_client().get(url, params=params, headers=headers, timeout=10, limiter=self.rate_limiter)
+        response.raise_for_status()
+        data = response.json()
+        
+        # Build a ticker -> earnings info index in one pass over the result rows
+        index = {}
+        for result in data.get('earnings', {}).get('result', []):
+            ticker = result.get('ticker')
+            if ticker and ticker not in index:
+                index[ticker] = {
+                    'eps_estimate': result.get('epsEstimate', {}).get('raw', 'N/A'),
+                    'quarter': result.get('quarter', 'N/A'),
+                    'year': result.get('year', 'N/A'),
+                    'earnings_date': result.get('earningsDate', 'N/A')
+                }
+        return index
     
     def get_earnings_api_data(self, symbol: str) -> dict:
         """
@@ -54,297 +171,562 @@ class EarningsScraper:
         This method gets quarters and estimates.
         """
         try:
-            # Yahoo Finance earnings calendar endpoint
-            url = f"https://query1.finance.yahoo.com/v7/finance/calendar/earnings"
-            params = {
-                'symbol': symbol,
-                'formatted': 'true',
-                'crumb': 'dummy',
-                'lang': 'en-US',
-                'region': 'US',
-                'corsDomain': 'finance.yahoo.com'
-            }
-            
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
+            def fetch_symbol():
+                return self._request_earnings_calendar([symbol]).get(symbol, dict(EMPTY_API_DATA))
             
-            response = requests.get(url, params=params, headers=headers, timeout=10)
+            # The remote fetch is already rate limited, so bypass _remote's limiter
+            if self.cache is None:
+                earnings_info = fetch_symbol()
+            else:
+                earnings_info = self.cache.get_or_fetch(symbol, 'earnings_calendar', fetch_symbol)
             
-            if response.status_code == 200:
-                data = response.json()
-                
-                # Parse earnings calendar data
-                if 'earnings' in data and 'result' in data['earnings']:
-                    results = data['earnings']['result']
-                    
-                    for result in results:
-                        if result.get('ticker') == symbol:
-                            earnings_info = {
-                                'eps_estimate': result.get('epsEstimate', {}).get('raw', 'N/A'),
-                                'quarter': result.get('quarter', 'N/A'),
-                                'year': result.get('year', 'N/A'),
-                                'earnings_date': result.get('earningsDate', 'N/A')
-                            }
-                            
-                            logger.info(f"Found API earnings info for {symbol}: {earnings_info}")
-                            return earnings_info
+            if earnings_info['eps_estimate'] != 'N/A' or earnings_info['quarter'] != 'N/A':
+                logger.info(f"Found API earnings info for {symbol}: {earnings_info}")
+            return earnings_info
                             
         except Exception as e:
             logger.debug(f"API earnings info failed for {symbol}: {e}")
             
-        return {
-            'eps_estimate': 'N/A',
-            'quarter': 'N/A',
-            'year': 'N/A',
-            'earnings_date': 'N/A'
-        }
+        return dict(EMPTY_API_DATA)
+    
+    def get_earnings_api_batch(self, symbols: list, chunk_size: int = API_BATCH_SIZE) -> dict:
+        """
+        Batch mode for get_earnings_api_data: fetch the earnings calendar once per
+        chunk of symbols and return a {ticker: earnings_info} index.
+        Symbols whose chunk request failed are left out so callers can fall back
+        to the per-symbol lookup.
+        """
+        index = {}
+        missing = []
+        
+        for symbol in dict.fromkeys(symbols):
+            cached = self.cache.get(symbol, 'earnings_calendar') if self.cache is not None else None
+            if cached is not None:
+                index[symbol] = cached
+            else:
+                missing.append(symbol)
+        
+        chunks = [missing[i:i + chunk_size] for i in range(0, len(missing), chunk_size)]
+        if chunks:
+            logger.info(f"Fetching earnings calendar for {len(missing)} tickers in {len(chunks)} batch requests")
+        
+        def fetch_chunk(chunk):
+            with self.metrics.stage('yahoo_api_batch') as stage:
+                chunk_index = self._request_earnings_calendar(chunk)
+                stage.succeeded()
+            # Symbols absent from a successful response have no calendar entry
+            return {symbol: chunk_index.get(symbol, dict(EMPTY_API_DATA)) for symbol in chunk}
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(fetch_chunk, chunk): chunk for chunk in chunks}
+            for future in as_completed(futures):
+                try:
+                    chunk_index = future.result()
+                except Exception as e:
+                    logger.debug(f"Batch earnings calendar failed for {len(futures[future])} tickers: {e}")
+                    continue
+                
+                for symbol, earnings_info in chunk_index.items():
+                    if self.cache is not None:
+                        self.cache.put(symbol, 'earnings_calendar', earnings_info)
+                    index[symbol] = earnings_info
+        
+        return index
 
-    def get_earnings_data(self, symbol: str) -> dict:
+    # Fallback stages in their default order, with the fields each one can fill
+    STAGE_FIELDS = {
+        'yahoo_api': ('eps_estimate', 'fiscal_quarter'),
+        'calendar': ('next_earnings_date',),
+        'info_fallback': ('next_earnings_date',),
+        'info_enrichment': ('eps_estimate', 'last_reported_eps', 'fiscal_quarter'),
+        'quarterly_earnings': ('last_reported_eps',),
+    }
+    
+    def _stage_yahoo_api(self, ctx: dict, earnings_data: dict) -> bool:
+        """1. Get detailed earnings info from Yahoo Finance API."""
+        api_data = ctx['api_data']
+        if api_data is None:
+            api_data = self.get_earnings_api_data(ctx['symbol'])
+        
+        found = False
+        if earnings_data['eps_estimate'] is None and api_data['eps_estimate'] != 'N/A':
+            earnings_data['eps_estimate'] = float(api_data['eps_estimate'])
+            found = True
+        if earnings_data['fiscal_quarter'] is None and api_data['quarter'] != 'N/A' and api_data['year'] != 'N/A':
+            earnings_data['fiscal_quarter'] = f"Q{api_data['quarter']} {api_data['year']}"
+            found = True
+        return found
+    
+    def _stage_calendar(self, ctx: dict, earnings_data: dict) -> bool:
+        """2. Get earnings date from calendar with robust handling."""
+        ticker = ctx['ticker']
+        calendar = self._remote(ctx['symbol'], 'calendar', lambda: ticker.calendar)
+        if calendar is not None:
+            # Try to get earnings date from calendar (both dict and DataFrame formats)
+            try:
+                # Handle dictionary format
+                if isinstance(calendar, dict) and 'Earnings Date' in calendar:
+                    earnings_date_list = calendar['Earnings Date']
+                    if isinstance(earnings_date_list, list) and len(earnings_date_list) > 0:
+                        earnings_data['next_earnings_date'] = earnings_date_list[0].strftime('%Y-%m-%d')
+                        logger.info(f"✅ Found earnings date from calendar dict: {earnings_data['next_earnings_date']}")
+                # Handle DataFrame format (wrapped in try/except to avoid type issues)
+                elif hasattr(calendar, 'index'):
+                    first_index = calendar.index[0]
+                    earnings_data['next_earnings_date'] = first_index.strftime('%Y-%m-%d')
+                    logger.info(f"✅ Found earnings date from calendar DataFrame: {earnings_data['next_earnings_date']}")
+            except:
+                pass
+        return bool(earnings_data['next_earnings_date'])
+    
+    def _stage_info_fallback(self, ctx: dict, earnings_data: dict) -> bool:
+        """3. Fallback: Get earnings date from info object."""
+        info = ctx['get_info']()
+        if info and 'earningsDate' in info:
+            earnings_date_info = info['earningsDate']
+            if isinstance(earnings_date_info, list) and len(earnings_date_info) > 0:
+                earnings_data['next_earnings_date'] = earnings_date_info[0].strftime('%Y-%m-%d')
+                logger.info(f"✅ Found earnings date from info: {earnings_data['next_earnings_date']}")
+                return True
+        return False
+    
+    def _stage_info_enrichment(self, ctx: dict, earnings_data: dict) -> bool:
+        """4. Get comprehensive company info for additional data."""
+        info = ctx['get_info']()
+        if not info:
+            return False
+        
+        found = False
+        # Get EPS estimates with multiple fallbacks
+        if earnings_data['eps_estimate'] is None:
+            if 'forwardEps' in info and info['forwardEps']:
+                earnings_data['eps_estimate'] = float(info['forwardEps'])
+                found = True
+            elif 'epsForward' in info and info['epsForward']:
+                earnings_data['eps_estimate'] = float(info['epsForward'])
+                found = True
+        
+        # Get trailing EPS (last reported)
+        if earnings_data['last_reported_eps'] is None:
+            if 'trailingEps' in info and info['trailingEps']:
+                earnings_data['last_reported_eps'] = float(info['trailingEps'])
+                found = True
+            elif 'epsTrailingTwelveMonths' in info and info['epsTrailingTwelveMonths']:
+                earnings_data['last_reported_eps'] = float(info['epsTrailingTwelveMonths'])
+                found = True
+        
+        # Get fiscal quarter info if not already found
+        if earnings_data['fiscal_quarter'] is None:
+            if 'mostRecentQuarter' in info and info['mostRecentQuarter']:
+                most_recent_quarter = datetime.fromtimestamp(info['mostRecentQuarter'])
+                # Calculate next quarter
+                next_quarter_date = most_recent_quarter + timedelta(days=90)
+                quarter_num = ((next_quarter_date.month - 1) // 3) + 1
+                earnings_data['fiscal_quarter'] = f"Q{quarter_num} {next_quarter_date.year}"
+                found = True
+        
+        return found
+    
+    def _stage_quarterly_earnings(self, ctx: dict, earnings_data: dict) -> bool:
+        """5. Get quarterly earnings for better EPS data."""
+        import pandas as pd
+
+        ticker = ctx['ticker']
+        quarterly_earnings = self._remote(ctx['symbol'], 'quarterly_earnings', lambda: ticker.quarterly_earnings)
+        if quarterly_earnings is not None and not quarterly_earnings.empty:
+            # Get most recent EPS if not already found
+            most_recent_eps = quarterly_earnings.iloc[0]['Earnings']
+            if pd.notna(most_recent_eps):
+                earnings_data['last_reported_eps'] = float(most_recent_eps)
+                return True
+        # A missing fiscal quarter is derived from the earnings date in earnings_table
+        return False
+    
+    def get_earnings_data(self, symbol: str, api_data: dict = None) -> dict:
         """
         Get comprehensive earnings data for a single ticker using multiple methods.
+        Pass `api_data` from get_earnings_api_batch to skip the per-symbol API call.
+        
+        Stages always run in the default chain order, which fixes which source
+        wins for each field; the source planner only drops stages that keep
+        failing for this ticker. A stage is skipped when every field it can
+        fill is already known. Each stage is timed and counted in `self.metrics`.
         """
+        from earnings_table import STATUS_ERROR, STATUS_OK
+        
         logger.info(f"Fetching data for {symbol}")
         
         try:
-            ticker = yf.Ticker(symbol)
+            ticker = _yfinance().Ticker(symbol)
+            info_cache = {}
+            
+            def get_info():
+                # ticker.info is shared by the info stages; fetch it at most once per run
+                if 'info' not in info_cache:
+                    info_cache['info'] = self._remote(symbol, 'info', lambda: ticker.info)
+                return info_cache['info']
+            
+            ctx = {'symbol': symbol, 'ticker': ticker, 'api_data': api_data, 'get_info': get_info}
             
-            # Initialize with default values
+            # Initialize with default values (None = not found yet)
             earnings_data = {
                 'next_earnings_date': None,
-                'last_reported_eps': 'N/A',
-                'eps_estimate': 'N/A',
-                'fiscal_quarter': 'N/A'
+                'last_reported_eps': None,
+                'eps_estimate': None,
+                'fiscal_quarter': None,
+                'status': STATUS_OK
             }
             
-            # 1. Get detailed earnings info from Yahoo Finance API
-            api_data = self.get_earnings_api_data(symbol)
-            if api_data['eps_estimate'] != 'N/A':
-                earnings_data['eps_estimate'] = f"{float(api_data['eps_estimate']):.2f}"
-            if api_data['quarter'] != 'N/A' and api_data['year'] != 'N/A':
-                earnings_data['fiscal_quarter'] = f"Q{api_data['quarter']} {api_data['year']}"
+            stages = list(self.STAGE_FIELDS)
+            if self.planner is not None:
+                stages = self.planner.plan(symbol, stages)
             
-            # 2. Get earnings date from calendar with robust handling
-            try:
-                calendar = ticker.calendar
-                if calendar is not None:
-                    # Try to get earnings date from calendar (both dict and DataFrame formats)
-                    try:
-                        # Handle dictionary format
-                        if isinstance(calendar, dict) and 'Earnings Date' in calendar:
-                            earnings_date_list = calendar['Earnings Date']
-                            if isinstance(earnings_date_list, list) and len(earnings_date_list) > 0:
-                                earnings_data['next_earnings_date'] = earnings_date_list[0].strftime('%Y-%m-%d')
-                                logger.info(f"✅ Found earnings date from calendar dict: {earnings_data['next_earnings_date']}")
-                        # Handle DataFrame format (wrapped in try/except to avoid type issues)
-                        elif hasattr(calendar, 'index'):
-                            first_index = calendar.index[0]
-                            earnings_data['next_earnings_date'] = first_index.strftime('%Y-%m-%d')
-                            logger.info(f"✅ Found earnings date from calendar DataFrame: {earnings_data['next_earnings_date']}")
-                    except:
-                        pass
-            except Exception as e:
-                logger.debug(f"Calendar method failed for {symbol}: {e}")
+            for name in stages:
+                if all(earnings_data[field] is not None for field in self.STAGE_FIELDS[name]):
+                    # Earlier sources already won these fields, which is no failure of this one
+                    if self.planner is not None:
+                        self.planner.record_skipped(symbol, name)
+                    continue
                 
-            # 3. Fallback: Get earnings date from info object
-            if not earnings_data['next_earnings_date']:
+                found = False
                 try:
-                    info = ticker.info
-                    if info and 'earningsDate' in info:
-                        earnings_date_info = info['earningsDate']
-                        if isinstance(earnings_date_info, list) and len(earnings_date_info) > 0:
-                            earnings_data['next_earnings_date'] = earnings_date_info[0].strftime('%Y-%m-%d')
-                            logger.info(f"✅ Found earnings date from info: {earnings_data['next_earnings_date']}")
+                    with self.metrics.stage(name) as stage:
+                        found = getattr(self, f"_stage_{name}")(ctx, earnings_data)
+                        if found:
+                            stage.succeeded()
                 except Exception as e:
-                    logger.debug(f"Info earnings date method failed for {symbol}: {e}")
-            
-            # 4. Get comprehensive company info for additional data
-            try:
-                info = ticker.info
-                if info:
-                    # Get EPS estimates with multiple fallbacks
-                    if earnings_data['eps_estimate'] == 'N/A':
-                        if 'forwardEps' in info and info['forwardEps']:
-                            earnings_data['eps_estimate'] = f"{float(info['forwardEps']):.2f}"
-                        elif 'epsForward' in info and info['epsForward']:
-                            earnings_data['eps_estimate'] = f"{float(info['epsForward']):.2f}"
-                    
-                    # Get trailing EPS (last reported)
-                    if 'trailingEps' in info and info['trailingEps']:
-                        earnings_data['last_reported_eps'] = f"{float(info['trailingEps']):.2f}"
-                    elif 'epsTrailingTwelveMonths' in info and info['epsTrailingTwelveMonths']:
-                        earnings_data['last_reported_eps'] = f"{float(info['epsTrailingTwelveMonths']):.2f}"
-                    
-                    # Get fiscal quarter info if not already found
-                    if earnings_data['fiscal_quarter'] == 'N/A':
-                        if 'mostRecentQuarter' in info and info['mostRecentQuarter']:
-                            most_recent_quarter = datetime.fromtimestamp(info['mostRecentQuarter'])
-                            # Calculate next quarter
-                            next_quarter_date = most_recent_quarter + timedelta(days=90)
-                            quarter_num = ((next_quarter_date.month - 1) // 3) + 1
-                            earnings_data['fiscal_quarter'] = f"Q{quarter_num} {next_quarter_date.year}"
-                        
-            except Exception as e:
-                logger.debug(f"Info method failed for {symbol}: {e}")
-            
-            # 5. Get quarterly earnings for better EPS data
-            try:
-                quarterly_earnings = ticker.quarterly_earnings
-                if quarterly_earnings is not None and not quarterly_earnings.empty:
-                    # Get most recent EPS if not already found
-                    if earnings_data['last_reported_eps'] == 'N/A':
-                        most_recent_eps = quarterly_earnings.iloc[0]['Earnings']
-                        if pd.notna(most_recent_eps):
-                            earnings_data['last_reported_eps'] = f"{float(most_recent_eps):.2f}"
-                    
-                    # Determine fiscal quarter if not already found
-                    if earnings_data['fiscal_quarter'] == 'N/A' and earnings_data['next_earnings_date']:
-                        next_date = datetime.strptime(earnings_data['next_earnings_date'], '%Y-%m-%d')
-                        quarter_num = ((next_date.month - 1) // 3) + 1
-                        earnings_data['fiscal_quarter'] = f"Q{quarter_num} {next_date.year}"
-                        
-            except Exception as e:
-                logger.debug(f"Quarterly earnings failed for {symbol}: {e}")
+                    logger.debug(f"{name} stage failed for {symbol}: {e}")
+                
+                if self.planner is not None:
+                    self.planner.record(symbol, name, found)
             
             return earnings_data
             
         except Exception as e:
             logger.error(f"Error fetching data for {symbol}: {e}")
             return {
-                'next_earnings_date': 'Error',
-                'last_reported_eps': 'N/A',
-                'eps_estimate': 'N/A',
-                'fiscal_quarter': 'N/A'
+                'next_earnings_date': None,
+                'last_reported_eps': None,
+                'eps_estimate': None,
+                'fiscal_quarter': None,
+                'status': STATUS_ERROR
             }
+        finally:
+            self.metrics.record_ticker()
     
-    def calculate_days_until_earnings(self, earnings_date: str) -> str:
-        """Calculate days until earnings date."""
-        try:
-            if not earnings_date or earnings_date in ['N/A', 'Error', 'TBD']:
-                return 'N/A'
-            
-            earnings_dt = datetime.strptime(earnings_date, '%Y-%m-%d')
-            days_diff = (earnings_dt - datetime.now()).days
-            
-            if days_diff > 0:
-                return f"{days_diff} days"
-            elif days_diff == 0:
-                return "Today"
-            else:
-                return f"{abs(days_diff)} days ago"
-        except:
-            return "Unknown"
-    
-    def scrape_all_tickers(self, tickers: list) -> list:
-        """Scrape earnings data for all tickers."""
-        logger.info(f"Scraping {len(tickers)} tickers")
-        results = []
+    def build_record(self, ticker: str, earnings_data: dict) -> dict:
+        """Create the typed output row for a ticker (formatting happens at export time)."""
+        return {
+            'Ticker': ticker,
+            'Earnings_Date': earnings_data['next_earnings_date'],
+            'Fiscal_Quarter': earnings_data['fiscal_quarter'],
+            'Last_Reported_EPS': earnings_data['last_reported_eps'],
+            'EPS_Estimate': earnings_data['eps_estimate'],
+            'Status': earnings_data['status']
+        }
+
+    def scrape_all_tickers(self, tickers: list, journal: CheckpointJournal = None) -> pd.DataFrame:
+        """
+        Scrape earnings data for all tickers using a bounded worker pool.
+        Returns a typed earnings table sorted by date; completed rows are
+        appended to `journal` as they finish.
+        """
+        from earnings_table import STATUS_ERROR, build_table
         
-        for i, ticker in enumerate(tickers, 1):
-            logger.info(f"Processing {i}/{len(tickers)}: {ticker}")
-            
-            # Get earnings data
-            earnings_data = self.get_earnings_data(ticker)
-            
-            # Create final record
-            record = {
-                'Ticker': ticker,
-                'Earnings_Date': earnings_data['next_earnings_date'] or 'TBD',
-                'Fiscal_Quarter': earnings_data['fiscal_quarter'],
-                'Last_Reported_EPS': earnings_data['last_reported_eps'],
-                'EPS_Estimate': earnings_data['eps_estimate'],
-                'Days_Until_Earnings': self.calculate_days_until_earnings(earnings_data['next_earnings_date'])
+        logger.info(f"Scraping {len(tickers)} tickers with {self.max_workers} workers")
+        records = {}
+        
+        # One batched calendar lookup fills eps_estimate/fiscal_quarter for the whole universe
+        api_index = self.get_earnings_api_batch(tickers)
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(self.get_earnings_data, ticker, api_index.get(ticker)): ticker
+                for ticker in tickers
             }
             
-            results.append(record)
-            
-            # Rate limiting
-            if i < len(tickers):
-                time.sleep(RATE_LIMIT_DELAY)
+            for i, future in enumerate(as_completed(futures), 1):
+                ticker = futures[future]
+                logger.info(f"Processed {i}/{len(tickers)}: {ticker}")
+                records[ticker] = self.build_record(ticker, future.result())
+                
+                # Errors are left out of the journal so a resumed run retries them
+                if journal is not None and records[ticker]['Status'] != STATUS_ERROR:
+                    journal.append(records[ticker])
+        
+        if self.cache is not None:
+            logger.info(f"Cache stats: {self.cache.summary()}")
+        if self.planner is not None:
+            self.planner.flush()
+        
+        # Keep input order before sorting so ties sort the same way as a sequential run
+        table = build_table([records[ticker] for ticker in dict.fromkeys(tickers)])
         
         # Sort results by earnings date (ascending order)
-        results = self.sort_by_earnings_date(results)
+        return self.sort_by_earnings_date(table)
+    
+    def merge_records(self, tickers: list, *record_sets) -> pd.DataFrame:
+        """
+        Merge rows from checkpoints and shards into one sorted table for `tickers`.
+        Record sets may be row lists or typed tables; later sets win.
+        """
+        import pandas as pd
+        from earnings_table import build_table, table_to_rows
+        
+        merged = {}
+        for records in record_sets:
+            if isinstance(records, pd.DataFrame):
+                records = table_to_rows(records)
+            for record in records:
+                merged[record['Ticker']] = record
         
-        return results
+        rows = [merged[ticker] for ticker in dict.fromkeys(tickers) if ticker in merged]
+        return self.sort_by_earnings_date(build_table(rows))
     
-    def sort_by_earnings_date(self, data: list) -> list:
+    def sort_by_earnings_date(self, table: pd.DataFrame) -> pd.DataFrame:
         """
         Sort earnings data by earnings date in ascending order.
-        Handles special cases like 'TBD', 'Error', 'N/A' by putting them at the end.
+        TBD and Error rows (no date) go at the end.
         """
-        def sort_key(record):
-            earnings_date = record['Earnings_Date']
-            
-            # Handle special cases - put them at the end
-            if earnings_date in ['TBD', 'Error', 'N/A', None]:
-                return datetime(9999, 12, 31)  # Far future date to sort last
-            
-            try:
-                # Parse the date and return it for sorting
-                return datetime.strptime(earnings_date, '%Y-%m-%d')
-            except:
-                # If parsing fails, put at the end
-                return datetime(9999, 12, 31)
-        
-        # Sort by earnings date (earliest first)
-        sorted_data = sorted(data, key=sort_key)
+        from earnings_table import sort_table
         
+        sorted_table = sort_table(table)
         logger.info("✅ Sorted earnings data by date (earliest first)")
-        return sorted_data
+        return sorted_table
     
-    def export_to_excel(self, data: list, filename: str) -> bool:
-        """Export data to Excel file."""
+    def export(self, table: pd.DataFrame, filename: str, fmt: str = None, upsert: bool = False) -> bool:
+        """
+        Export records with a pluggable backend (xlsx, csv or parquet; picked from
+        the file extension when `fmt` is not given).
+        
+        With `upsert=True`, records are merged by ticker into the previous export
+        and the file is only written when some row's data actually changed; CSV
+        is patched from the first changed row on instead of being rewritten.
+        Parquet gets the typed columns, the other formats the display strings.
+        """
+        from earnings_table import format_table, table_to_rows, typed_table
+        
         try:
-            if not data:
+            if table is None or table.empty:
                 logger.warning("No data to export")
                 return False
             
-            # Create DataFrame and export
-            df = pd.DataFrame(data)
-            os.makedirs(os.path.dirname(filename), exist_ok=True)
+            exporter = get_exporter(fmt, filename)
             
-            with pd.ExcelWriter(filename, engine='openpyxl') as writer:
-                df.to_excel(writer, sheet_name='Earnings Calendar', index=False)
-                
-                # Auto-adjust column widths
-                worksheet = writer.sheets['Earnings Calendar']
-                for column in worksheet.columns:
-                    max_length = max(len(str(cell.value)) for cell in column)
-                    worksheet.column_dimensions[column[0].column_letter].width = max_length + 2
+            state = None
+            if upsert:
+                state = ExportState(filename)
+                changed = state.upsert(table_to_rows(table))
+                if not state.needs_write(filename):
+                    logger.info(f"✅ No changes since last export of {filename}")
+                    return True
+                logger.info(f"Upserting {len(changed)} changed records into {filename}")
+                all_records = state.records()
+                table = self.merge_records([record['Ticker'] for record in all_records], all_records)
             
-            logger.info(f"✅ Exported {len(data)} records to {filename}")
+            # Display formatting (dates, 2-decimal EPS, day counts) happens only here
+            frame = typed_table(table) if exporter.typed else format_table(table)
+            if state is not None:
+                written = exporter.update(frame, filename, state)
+                state.save()
+                logger.info(f"Wrote {written} of {len(frame)} rows to {filename}")
+            else:
+                exporter.write(frame, filename)
+            
+            logger.info(f"✅ Exported {len(table)} records to {filename}")
             return True
             
         except Exception as e:
             logger.error(f"Export failed: {e}")
             return False
+    
+    def export_to_excel(self, table: pd.DataFrame, filename: str) -> bool:
+        """Export data to Excel file."""
+        return self.export(table, filename, fmt='xlsx')
+
+# ===============================================================================
+# 🧩 SHARDED / RESUMABLE RUNS
+# ===============================================================================
+
+def _scrape_shard(shard_index: int, tickers: list, checkpoint_dir: str, settings: dict) -> tuple:
+    """Worker process entry point: scrape one shard and journal every record."""
+    from earnings_table import table_to_rows
+    
+    scraper = EarningsScraper(**settings)
+    journal_path = os.path.join(checkpoint_dir, f"shard-{shard_index:03d}-{os.getpid()}.jsonl")
+    with CheckpointJournal(journal_path) as journal:
+        rows = table_to_rows(scraper.scrape_all_tickers(tickers, journal=journal))
+    
+    if scraper.cache is not None:
+        scraper.metrics.add_cache_stats(scraper.cache.stats)
+    return rows, scraper.metrics.snapshot()
+
+
+def run_scrape(tickers: list, shards: int = 1, checkpoint_dir: str = CHECKPOINT_DIR,
+               resume: bool = True, scraper: EarningsScraper = None, **settings) -> pd.DataFrame:
+    """
+    Scrape `tickers` with checkpointing, optionally split across worker processes.
+
+    Tickers already present in `checkpoint_dir` are not fetched again. With
+    `shards` > 1 the remaining tickers are split round-robin across processes,
+    each with its own journal and an equal share of the request rate. All
+    records are merged into the same sorted output scrape_all_tickers returns.
+    Shard metrics are merged into `scraper.metrics`.
+    """
+    tickers = list(dict.fromkeys(tickers))
+    if not resume:
+        clear_checkpoints(checkpoint_dir)
+    
+    completed = load_checkpoints(checkpoint_dir)
+    completed = [completed[ticker] for ticker in tickers if ticker in completed]
+    done = {record['Ticker'] for record in completed}
+    remaining = [ticker for ticker in tickers if ticker not in done]
+    if completed:
+        logger.info(f"Resuming: {len(completed)} tickers checkpointed, {len(remaining)} remaining")
+    
+    scraper = scraper or EarningsScraper(**settings)
+    fresh = []
+    
+    if remaining and (shards <= 1 or len(remaining) < 2):
+        journal_path = os.path.join(checkpoint_dir, f"run-{os.getpid()}.jsonl")
+        with CheckpointJournal(journal_path) as journal:
+            fresh = scraper.scrape_all_tickers(remaining, journal=journal)
+    elif remaining:
+        shard_lists = split_shards(remaining, shards)
+        shard_settings = dict(settings)
+        shard_settings['requests_per_second'] = (
+            settings.get('requests_per_second', RATE_LIMIT_PER_SEC) / len(shard_lists)
+        )
+        logger.info(f"Running {len(shard_lists)} shards of ~{len(shard_lists[0])} tickers each")
+        
+        # Spawned shard processes don't inherit main()'s logging setup
+        with ProcessPoolExecutor(max_workers=len(shard_lists), initializer=setup_logging, initargs=(None,)) as executor:
+            futures = [
+                executor.submit(_scrape_shard, i, shard, checkpoint_dir, shard_settings)
+                for i, shard in enumerate(shard_lists)
+            ]
+            for future in as_completed(futures):
+                rows, shard_metrics = future.result()
+                fresh.extend(rows)
+                scraper.metrics.merge(shard_metrics)
+    
+    return scraper.merge_records(tickers, completed, fresh)
 
 # ===============================================================================
 # 🚀 MAIN EXECUTION
 # ===============================================================================
 
-def main():
+def parse_args(argv: list = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Scrape upcoming earnings dates from Yahoo Finance")
+    parser.add_argument('--tickers', help="comma-separated tickers to scrape instead of the built-in list")
+    parser.add_argument('--tickers-file', help="CSV (Ticker/Symbol column) or text file with one ticker per line")
+    parser.add_argument('--format', choices=sorted(EXPORTERS), default='xlsx', help="output format (default: xlsx)")
+    parser.add_argument('--output', help=f"output file (default: {OUTPUT_FILE} with the format's extension)")
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS,
+                        help=f"concurrent ticker fetches per process (default: {MAX_WORKERS})")
+    parser.add_argument('--rate', type=float, default=RATE_LIMIT_PER_SEC,
+                        help=f"remote calls/sec shared by all workers, ~3 per ticker (default: {RATE_LIMIT_PER_SEC})")
+    parser.add_argument('--shards', type=int, default=1, help="number of worker processes (default: 1)")
+    parser.add_argument('--no-resume', action='store_true', help="ignore checkpoints from an interrupted run")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="show what would be scraped and where it would be written, without fetching anything")
+    parser.add_argument('--no-history', action='store_true',
+                        help=f"don't add this run to the snapshot history in {HISTORY_DIR}")
+    parser.add_argument('--log-file', default=LOG_FILE, help=f"log file, or '' for console only (default: {LOG_FILE})")
+    parser.add_argument('--metrics-file', default=METRICS_FILE, help=f"where to write JSON metrics (default: {METRICS_FILE})")
+    parser.add_argument('--profile', action='store_true', help=f"capture a cProfile of the run to {PROFILE_FILE}")
+    parser.add_argument('--watch', action='store_true',
+                        help="keep running and refresh tickers by how close their earnings date is")
+    return parser.parse_args(argv)
+
+
+def resolve_tickers(args: argparse.Namespace) -> list:
+    if args.tickers_file:
+        return load_tickers(args.tickers_file)
+    if args.tickers:
+        return list(dict.fromkeys(ticker.strip().upper() for ticker in args.tickers.split(',') if ticker.strip()))
+    return TICKERS
+
+
+def print_plan(args: argparse.Namespace, tickers: list, output_file: str):
+    """Dry run: what a real run would do, without importing the data stack or touching the network."""
+    completed = {} if args.no_resume or args.watch else load_checkpoints(CHECKPOINT_DIR)
+    checkpointed = sum(1 for ticker in tickers if ticker in completed)
+    preview = ", ".join(tickers[:10]) + (f", ... (+{len(tickers) - 10})" if len(tickers) > 10 else "")
+    
+    print("🧪 Dry run - nothing will be fetched")
+    print(f"📊 Tickers: {len(tickers)} ({preview})")
+    print(f"🔁 Mode: {'watch' if args.watch else f'{args.shards} shard(s)'}, "
+          f"{args.workers} workers, {args.rate} requests/sec")
+    if not args.watch:
+        print(f"📌 Checkpointed: {checkpointed}, to fetch: {len(tickers) - checkpointed}")
+    print(f"💾 Output: {output_file} ({args.format})")
+    if not args.watch:
+        print(f"🗂️ History: {'off' if args.no_history else HISTORY_DIR}")
+    print(f"🗃️ Cache: {CACHE_FILE or 'off'} | Planner: {PLANNER_FILE or 'off'}")
+
+
+def main(argv: list = None):
     """Main function to run the earnings scraper."""
+    args = parse_args(argv)
+    tickers = resolve_tickers(args)
+    output_file = args.output or f"{os.path.splitext(OUTPUT_FILE)[0]}.{args.format}"
+    
+    if args.dry_run:
+        print_plan(args, tickers, output_file)
+        return
+    
+    setup_logging(args.log_file or None)
+    
+    profiler = None
+    if args.profile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    
     print("🚀 Starting Earnings Scraper...")
-    print(f"📊 Processing tickers: {', '.join(TICKERS)}")
+    print(f"📊 Processing {len(tickers)} tickers")
     
     # Initialize scraper
-    scraper = EarningsScraper()
+    settings = {'max_workers': args.workers, 'requests_per_second': args.rate}
+    scraper = EarningsScraper(**settings)
     
-    # Scrape data
-    earnings_data = scraper.scrape_all_tickers(TICKERS)
+    if args.watch:
+        from watch_mode import EarningsWatcher
+        
+        # Daemon mode: refresh by date proximity, re-export only when records change
+        EarningsWatcher(scraper, tickers, output_file, fmt=args.format).run()
+        print("🏁 Watch mode stopped!")
+        return
+    
+    # Scrape data (resumes from checkpoints left by an interrupted run)
+    earnings_data = run_scrape(tickers, shards=args.shards, resume=not args.no_resume, scraper=scraper, **settings)
     
     # Export results
-    if earnings_data:
-        success = scraper.export_to_excel(earnings_data, OUTPUT_FILE)
+    if not earnings_data.empty:
+        success = scraper.export(earnings_data, output_file, fmt=args.format)
         if success:
-            print(f"✅ Data exported to {OUTPUT_FILE}")
+            from earnings_table import format_table, table_to_rows
+            
+            print(f"✅ Data exported to {output_file}")
+            clear_checkpoints(CHECKPOINT_DIR)
+            
+            if not args.no_history:
+                from snapshot_history import SnapshotHistory
+                
+                # The export is overwritten every run; the history keeps each run and what changed
+                history = SnapshotHistory(HISTORY_DIR)
+                try:
+                    run = history.record_run(table_to_rows(earnings_data))
+                finally:
+                    history.close()
+                print(f"🗂️ Snapshot #{run['run_id']} saved: {run['changed']} tickers changed since their last snapshot")
             
             # Print summary
             print("\n" + "="*50)
             print("📊 EARNINGS SUMMARY")
             print("="*50)
-            for record in earnings_data:
+            for record in format_table(earnings_data).to_dict('records'):
                 print(f"{record['Ticker']}: {record['Earnings_Date']} | "
                       f"Quarter: {record['Fiscal_Quarter']} | "
                       f"Days: {record['Days_Until_Earnings']}")
@@ -354,7 +736,25 @@ def main():
     else:
         print("❌ No data found")
     
+    # Metrics summary
+    if scraper.cache is not None:
+        scraper.metrics.add_cache_stats(scraper.cache.stats)
+    scraper.metrics.write_json(args.metrics_file)
+    print("\n📈 FETCH METRICS")
+    print(scraper.metrics.summary_table())
+    print(f"📈 Metrics written to {args.metrics_file}")
+    
+    if profiler:
+        import pstats
+        
+        profiler.disable()
+        profiler.dump_stats(PROFILE_FILE)
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(20)
+        print(f"🔬 Profile written to {PROFILE_FILE}")
+    
     print("🏁 Scraping completed!")
 
 if __name__ == "__main__":
+    # common/ sits at the repository root; library users put it on the path themselves
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     main() 
\ No newline at end of file
@@ -0,0 +1,100 @@
+"""
+🧮 EARNINGS TABLE
+Typed columnar post-processing: datetime64 dates, float EPS and an explicit status
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+STATUS_OK = 'ok'
+STATUS_TBD = 'tbd'
+STATUS_ERROR = 'error'
+
+COLUMNS = ['Ticker', 'Earnings_Date', 'Fiscal_Quarter', 'Last_Reported_EPS', 'EPS_Estimate', 'Status']
+EXPORT_COLUMNS = ['Ticker', 'Earnings_Date', 'Fiscal_Quarter', 'Last_Reported_EPS', 'EPS_Estimate', 'Days_Until_Earnings']
+EPS_COLUMNS = ['Last_Reported_EPS', 'EPS_Estimate']
+
+
+def build_table(rows: list) -> pd.DataFrame:
+    """
+    Build a typed table from row dicts.
+
+    Dates become datetime64 (NaT when missing), EPS becomes float (NaN when
+    missing) and Status is derived when a row does not carry one. Rows written
+    in the old string format ('TBD', 'N/A', 'Error') are converted as well.
+    """
+    df = pd.DataFrame.from_records(rows, columns=COLUMNS)
+
+    raw_dates = df['Earnings_Date']
+    df['Earnings_Date'] = pd.to_datetime(raw_dates, format='%Y-%m-%d', errors='coerce')
+    for column in EPS_COLUMNS:
+        df[column] = pd.to_numeric(df[column], errors='coerce').astype('float64')
+    df['Fiscal_Quarter'] = df['Fiscal_Quarter'].where(df['Fiscal_Quarter'] != 'N/A')
+
+    status = df['Status'].where(df['Status'].notna(), STATUS_OK)
+    status = status.mask(raw_dates.eq('Error'), STATUS_ERROR)
+    status = status.mask(df['Earnings_Date'].isna() & status.eq(STATUS_OK), STATUS_TBD)
+    df['Status'] = status.astype('category')
+
+    return derive_fiscal_quarter(df)
+
+
+def table_to_rows(df: pd.DataFrame) -> list:
+    """Convert a typed table back to JSON-friendly row dicts (None for missing values)."""
+    out = df[COLUMNS].copy()
+    out['Earnings_Date'] = out['Earnings_Date'].dt.strftime('%Y-%m-%d')
+    out['Status'] = out['Status'].astype(object)
+    out = out.astype(object).where(out.notna(), None)
+    return out.to_dict('records')
+
+
+def derive_fiscal_quarter(df: pd.DataFrame) -> pd.DataFrame:
+    """Fill missing Fiscal_Quarter values from the calendar quarter of Earnings_Date."""
+    dates = df['Earnings_Date']
+    derived = 'Q' + dates.dt.quarter.astype('Int64').astype(str) + ' ' + dates.dt.year.astype('Int64').astype(str)
+    missing = df['Fiscal_Quarter'].isna() & dates.notna()
+    df['Fiscal_Quarter'] = df['Fiscal_Quarter'].mask(missing, derived)
+    return df
+
+
+def days_until(dates: pd.Series, now: datetime = None) -> pd.Series:
+    """Whole days from `now` until each date (negative for past dates, <NA> for NaT)."""
+    now = pd.Timestamp(now or datetime.now())
+    return (dates - now).dt.days.astype('Int64')
+
+
+def sort_table(df: pd.DataFrame) -> pd.DataFrame:
+    """Sort by earnings date ascending; TBD/Error rows (NaT) go last, ties keep input order."""
+    return df.sort_values('Earnings_Date', na_position='last', kind='stable').reset_index(drop=True)
+
+
+def typed_table(df: pd.DataFrame, now: datetime = None) -> pd.DataFrame:
+    """The export columns with their types kept, plus Status, for columnar formats."""
+    out = df[COLUMNS].copy()
+    out['Days_Until_Earnings'] = days_until(df['Earnings_Date'], now)
+    return out[EXPORT_COLUMNS + ['Status']]
+
+
+def format_table(df: pd.DataFrame, now: datetime = None) -> pd.DataFrame:
+    """Render the typed table into the display strings used by the exports."""
+    out = pd.DataFrame({'Ticker': df['Ticker'].astype(str)})
+
+    placeholder = np.where(df['Status'].astype(object) == STATUS_ERROR, 'Error', 'TBD')
+    out['Earnings_Date'] = df['Earnings_Date'].dt.strftime('%Y-%m-%d').fillna(pd.Series(placeholder, index=df.index))
+    out['Fiscal_Quarter'] = df['Fiscal_Quarter'].fillna('N/A')
+
+    for column in EPS_COLUMNS:
+        values = df[column]
+        out[column] = values.map('{:.2f}'.format).where(values.notna(), 'N/A')
+
+    days = days_until(df['Earnings_Date'], now)
+    text = days.abs().astype(str)
+    out['Days_Until_Earnings'] = np.select(
+        [days.isna().to_numpy(), (days > 0).fillna(False).to_numpy(), (days == 0).fillna(False).to_numpy()],
+        ['N/A', text + ' days', 'Today'],
+        default=text + ' days ago'
+    )
+
+    return out[EXPORT_COLUMNS]
@@ -0,0 +1,224 @@
+"""
+📤 EXPORTERS
+Pluggable output backends (streaming xlsx, CSV, Parquet) plus upsert state
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from datetime import date
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd  # imported where a table is written, so choosing a format stays cheap
+
+SHEET_NAME = 'Earnings Calendar'
+WIDTH_PADDING = 2
+MAX_COLUMN_WIDTH = 60
+
+
+def column_widths(df: pd.DataFrame) -> list:
+    """Column widths from vectorized string lengths (header included)."""
+    import pandas as pd
+
+    widths = []
+    for column in df.columns:
+        longest = df[column].astype(str).str.len().max() if len(df) else 0
+        longest = max(int(longest if pd.notna(longest) else 0), len(str(column)))
+        widths.append(min(longest + WIDTH_PADDING, MAX_COLUMN_WIDTH))
+    return widths
+
+
+def _atomic_target(filename: str) -> str:
+    directory = os.path.dirname(filename)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    return f"{filename}.tmp"
+
+
+class Exporter:
+    """Base class: write a DataFrame to `filename`, replacing it atomically."""
+
+    extension = ''
+    typed = False  # True: takes the typed table (earnings_table.typed_table), not the display strings
+
+    def write(self, df: pd.DataFrame, filename: str):
+        tmp = _atomic_target(filename)
+        try:
+            self._write(df, tmp)
+            os.replace(tmp, filename)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def update(self, df: pd.DataFrame, filename: str, state: ExportState) -> int:
+        """
+        Bring `filename` up to date with `df` during an upsert. Returns the rows
+        written; formats that cannot be patched in place are rewritten whole.
+        """
+        self.write(df, filename)
+        return len(df)
+
+    def _write(self, df: pd.DataFrame, path: str):
+        raise NotImplementedError
+
+
+class XlsxExporter(Exporter):
+    """Streams rows through openpyxl's write-only workbook instead of building the whole sheet in memory."""
+
+    extension = 'xlsx'
+
+    def __init__(self, sheet_name: str = SHEET_NAME):
+        self.sheet_name = sheet_name
+
+    def _write(self, df: pd.DataFrame, path: str):
+        from openpyxl import Workbook
+        from openpyxl.utils import get_column_letter
+
+        workbook = Workbook(write_only=True)
+        worksheet = workbook.create_sheet(self.sheet_name)
+
+        # Widths must be set before any row is streamed
+        for i, width in enumerate(column_widths(df), 1):
+            worksheet.column_dimensions[get_column_letter(i)].width = width
+
+        worksheet.append(list(df.columns))
+        for row in df.itertuples(index=False, name=None):
+            worksheet.append(row)
+
+        # openpyxl picks the format from the file extension, so save via a handle
+        with open(path, 'wb') as f:
+            workbook.save(f)
+
+
+class CsvExporter(Exporter):
+    """
+    Plain CSV. On upsert the rendered lines are compared with the previous
+    export (line hashes kept in the upsert state) and only the file from the
+    first changed line onward is rewritten, so appended rows and changes near
+    the end of the sort order leave the rest of the file untouched.
+    """
+
+    extension = 'csv'
+
+    @staticmethod
+    def _lines(df: pd.DataFrame) -> list:
+        return df.to_csv(index=False, lineterminator='\n').encode('utf-8').splitlines(keepends=True)
+
+    def _write(self, df: pd.DataFrame, path: str):
+        with open(path, 'wb') as f:
+            f.writelines(self._lines(df))
+
+    def update(self, df: pd.DataFrame, filename: str, state: ExportState) -> int:
+        lines = self._lines(df)
+        digests = [hashlib.sha1(line).hexdigest()[:16] for line in lines]
+        layout = state.layout
+
+        # Patch only a file that is exactly as the last upsert left it (size checks for edits or a torn write)
+        if layout and os.path.exists(filename) and os.path.getsize(filename) == layout['size']:
+            previous = layout['lines']
+            first = next((i for i, (old, new) in enumerate(zip(previous, digests)) if old[0] != new),
+                         min(len(previous), len(digests)))
+            with open(filename, 'r+b') as f:
+                f.seek(sum(length for _, length in previous[:first]))
+                f.writelines(lines[first:])
+                f.truncate()
+        else:
+            first = 0
+            tmp = _atomic_target(filename)
+            with open(tmp, 'wb') as f:
+                f.writelines(lines)
+            os.replace(tmp, filename)
+
+        state.layout = {
+            'size': sum(len(line) for line in lines),
+            'lines': [[digest, len(line)] for digest, line in zip(digests, lines)],
+        }
+        # The header is line 0
+        return max(len(lines) - max(first, 1), 0)
+
+
+class ParquetExporter(Exporter):
+    """Columnar output with typed columns: dates, float EPS, integer day counts (requires pyarrow or fastparquet)."""
+
+    extension = 'parquet'
+    typed = True
+
+    def _write(self, df: pd.DataFrame, path: str):
+        df.to_parquet(path, index=False)
+
+
+EXPORTERS = {
+    'xlsx': XlsxExporter,
+    'csv': CsvExporter,
+    'parquet': ParquetExporter,
+}
+
+
+def get_exporter(fmt: str = None, filename: str = None) -> Exporter:
+    """Pick an exporter by format name, or by the output file extension."""
+    if not fmt and filename:
+        fmt = os.path.splitext(filename)[1].lstrip('.')
+    fmt = (fmt or 'xlsx').lower()
+    if fmt not in EXPORTERS:
+        raise ValueError(f"Unknown export format '{fmt}' (choose from {', '.join(EXPORTERS)})")
+    return EXPORTERS[fmt]()
+
+
+# ===============================================================================
+# 🔁 UPSERT STATE
+# ===============================================================================
+
+def record_hash(record: dict) -> str:
+    return hashlib.sha1(json.dumps(record, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+class ExportState:
+    """
+    Sidecar manifest that remembers every exported row and its content hash.
+
+    Upserting a batch of records only touches rows whose data changed, and
+    `needs_write` tells the caller whether the output file must be rewritten
+    at all (something changed, or the day counts rendered at export are from
+    another day).
+    """
+
+    def __init__(self, filename: str):
+        self.path = f"{filename}.state.json"
+        self.rows = {}
+        self.exported_on = None
+        self.layout = None  # exporter-specific record of the written file (see CsvExporter.update)
+        self.changed = set()
+
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            self.rows = state.get('rows', {})
+            self.exported_on = state.get('exported_on')
+            self.layout = state.get('layout')
+
+    def upsert(self, records: list) -> set:
+        """Merge records by Ticker. Returns the tickers whose data changed."""
+        for record in records:
+            digest = record_hash(record)
+            current = self.rows.get(record['Ticker'])
+            if current is None or current['hash'] != digest:
+                self.rows[record['Ticker']] = {'hash': digest, 'record': record}
+                self.changed.add(record['Ticker'])
+        return self.changed
+
+    def records(self) -> list:
+        return [row['record'] for row in self.rows.values()]
+
+    def needs_write(self, filename: str) -> bool:
+        return bool(self.changed) or self.exported_on != date.today().isoformat() or not os.path.exists(filename)
+
+    def save(self):
+        self.exported_on = date.today().isoformat()
+        tmp = _atomic_target(self.path)
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'exported_on': self.exported_on, 'rows': self.rows, 'layout': self.layout}, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+        self.changed = set()
@@ -0,0 +1,179 @@
+"""
+📈 SCRAPER METRICS
+Per-stage latency histograms, outcome counters, cache hit rates and throughput
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+OUTCOMES = ('success', 'failure', 'exception')
+
+
+def _empty_stage() -> dict:
+    return {
+        'success': 0,
+        'failure': 0,
+        'exception': 0,
+        'total_ms': 0.0,
+        'max_ms': 0.0,
+        'buckets': [0] * (len(LATENCY_BUCKETS_MS) + 1),
+    }
+
+
+def _percentile(buckets: list, fraction: float, max_ms: float) -> float:
+    """
+    Approximate percentile: upper bound of the bucket holding the requested rank,
+    capped at the slowest call seen (so the overflow bucket stays finite and JSON-safe).
+    """
+    total = sum(buckets)
+    if not total:
+        return 0.0
+    rank = fraction * total
+    seen = 0
+    for i, count in enumerate(buckets):
+        seen += count
+        if seen >= rank:
+            return min(float(LATENCY_BUCKETS_MS[i]), max_ms) if i < len(LATENCY_BUCKETS_MS) else max_ms
+    return max_ms
+
+
+class StageTimer:
+    """Handle yielded by ScraperMetrics.stage(); call succeeded() when the stage produced data."""
+
+    def __init__(self):
+        self.ok = False
+
+    def succeeded(self):
+        self.ok = True
+
+
+class ScraperMetrics:
+    """
+    Thread-safe metrics for the earnings fetch path.
+
+    Wrap each fallback stage in `with metrics.stage(name) as stage:`. The stage
+    is counted as a success when `stage.succeeded()` was called, a failure when
+    it finished without data, and an exception when it raised (the exception
+    still propagates to the caller's own handler).
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self.tickers = 0
+        self.stages = {}
+        self.cache = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str):
+        timer = StageTimer()
+        start = time.perf_counter()
+        try:
+            yield timer
+        except Exception:
+            self._record(name, 'exception', start)
+            raise
+        self._record(name, 'success' if timer.ok else 'failure', start)
+
+    def _record(self, name: str, outcome: str, start: float):
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        bucket = next((i for i, bound in enumerate(LATENCY_BUCKETS_MS) if elapsed_ms <= bound),
+                      len(LATENCY_BUCKETS_MS))
+        with self._lock:
+            stats = self.stages.setdefault(name, _empty_stage())
+            stats[outcome] += 1
+            stats['total_ms'] += elapsed_ms
+            stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+            stats['buckets'][bucket] += 1
+
+    def record_ticker(self, count: int = 1):
+        with self._lock:
+            self.tickers += count
+
+    def add_cache_stats(self, stats: dict):
+        """Add per-source hit/miss counters (from ResponseCache.stats or another process)."""
+        with self._lock:
+            for source, counters in stats.items():
+                merged = self.cache.setdefault(source, {'hits': 0, 'misses': 0})
+                merged['hits'] += counters.get('hits', 0)
+                merged['misses'] += counters.get('misses', 0)
+
+    def merge(self, snapshot: dict):
+        """Fold in a snapshot() taken in another process (e.g. a shard)."""
+        with self._lock:
+            self.tickers += snapshot.get('tickers', 0)
+            for name, other in snapshot.get('raw_stages', {}).items():
+                stats = self.stages.setdefault(name, _empty_stage())
+                for outcome in OUTCOMES:
+                    stats[outcome] += other[outcome]
+                stats['total_ms'] += other['total_ms']
+                stats['max_ms'] = max(stats['max_ms'], other['max_ms'])
+                stats['buckets'] = [a + b for a, b in zip(stats['buckets'], other['buckets'])]
+        self.add_cache_stats(snapshot.get('cache', {}))
+
+    def snapshot(self) -> dict:
+        """JSON-serializable view of all metrics."""
+        with self._lock:
+            elapsed = max(time.time() - self.started, 1e-9)
+            stages = {}
+            for name, stats in self.stages.items():
+                calls = sum(stats[outcome] for outcome in OUTCOMES)
+                stages[name] = {
+                    'calls': calls,
+                    'success': stats['success'],
+                    'failure': stats['failure'],
+                    'exception': stats['exception'],
+                    'success_rate': stats['success'] / calls if calls else 0.0,
+                    'mean_ms': stats['total_ms'] / calls if calls else 0.0,
+                    'p50_ms': _percentile(stats['buckets'], 0.50, stats['max_ms']),
+                    'p95_ms': _percentile(stats['buckets'], 0.95, stats['max_ms']),
+                    'max_ms': stats['max_ms'],
+                    'histogram_ms': dict(zip([str(b) for b in LATENCY_BUCKETS_MS] + ['inf'], stats['buckets'])),
+                }
+            cache = {
+                source: dict(counters, hit_rate=counters['hits'] / max(counters['hits'] + counters['misses'], 1))
+                for source, counters in self.cache.items()
+            }
+            return {
+                'started_at': self.started,
+                'elapsed_sec': elapsed,
+                'tickers': self.tickers,
+                'tickers_per_sec': self.tickers / elapsed,
+                'stages': stages,
+                'cache': cache,
+                'raw_stages': json.loads(json.dumps(self.stages)),
+            }
+
+    def write_json(self, path: str) -> dict:
+        snapshot = self.snapshot()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, indent=2)
+        return snapshot
+
+    def summary_table(self) -> str:
+        """Plain-text table for the end-of-run console summary."""
+        snapshot = self.snapshot()
+        lines = [
+            f"{'Stage':<22}{'Calls':>7}{'OK':>7}{'Fail':>7}{'Exc':>6}{'Mean ms':>10}{'p95 ms':>9}{'Max ms':>9}",
+            "-" * 77,
+        ]
+        for name, stats in snapshot['stages'].items():
+            lines.append(
+                f"{name:<22}{stats['calls']:>7}{stats['success']:>7}{stats['failure']:>7}{stats['exception']:>6}"
+                f"{stats['mean_ms']:>10.1f}{stats['p95_ms']:>9.0f}{stats['max_ms']:>9.0f}"
+            )
+        lines.append("-" * 77)
+        for source, counters in sorted(snapshot['cache'].items()):
+            lines.append(f"cache {source:<18}{counters['hits']:>7} hits {counters['misses']:>7} misses "
+                         f"({counters['hit_rate'] * 100:.0f}% hit rate)")
+        lines.append(f"{snapshot['tickers']} tickers in {snapshot['elapsed_sec']:.1f}s "
+                     f"({snapshot['tickers_per_sec']:.2f} tickers/sec)")
+        return "\n".join(lines)
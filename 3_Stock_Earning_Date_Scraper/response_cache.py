@@ -0,0 +1,211 @@
+"""
+💾 RESPONSE CACHE
+On-disk TTL cache for Yahoo Finance / yfinance lookups, keyed by (symbol, source)
+"""
+
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+# Seconds each source stays fresh. Earnings dates change rarely, prices-derived
+# fields (info) a little more often.
+DEFAULT_TTLS = {
+    'earnings_calendar': 6 * 3600,
+    'calendar': 12 * 3600,
+    'info': 6 * 3600,
+    'quarterly_earnings': 24 * 3600,
+}
+DEFAULT_TTL = 3600
+# Empty answers are often throttling rather than "no data", so they are asked again soon
+NEGATIVE_TTL = 10 * 60
+DEFAULT_MAX_ENTRIES = 50_000
+
+_MISSING = object()
+
+
+def is_empty(value) -> bool:
+    """True for lookups that found nothing: None, empty containers/frames, or dicts of only None/'N/A'."""
+    if value is None:
+        return True
+    if hasattr(value, 'empty'):  # DataFrame / Series
+        return bool(value.empty)
+    if isinstance(value, dict):
+        return all(v is None or (isinstance(v, str) and v == 'N/A') for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return not value
+    return False
+
+
+class ResponseCache:
+    """
+    SQLite-backed response cache with per-source TTLs and LRU eviction.
+
+    Values are pickled, so anything yfinance returns (dicts, DataFrames) can be
+    stored. Empty results (see `is_empty`) are kept for `negative_ttl` only, so
+    a burst of throttled lookups does not freeze empty rows for a full TTL.
+    Entries read during the current run are also kept in memory so the same
+    lookup is never unpickled twice. Hit/miss counters are kept per source.
+    """
+
+    def __init__(self, path: str, ttls: dict = None, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 negative_ttl: float = NEGATIVE_TTL):
+        self.path = path
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.stats = {}
+        self._memory = {}
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                symbol TEXT NOT NULL,
+                source TEXT NOT NULL,
+                value BLOB NOT NULL,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                ttl REAL,
+                PRIMARY KEY (symbol, source)
+            )
+        """)
+        # Caches written before per-entry TTLs existed
+        if 'ttl' not in {row[1] for row in self._conn.execute("PRAGMA table_info(responses)")}:
+            self._conn.execute("ALTER TABLE responses ADD COLUMN ttl REAL")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)")
+        self._conn.commit()
+        (self._size,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+
+    def ttl_for(self, source: str) -> float:
+        return self.ttls.get(source, DEFAULT_TTL)
+
+    def _count(self, source: str, outcome: str):
+        counters = self.stats.setdefault(source, {'hits': 0, 'misses': 0})
+        counters[outcome] += 1
+
+    def get(self, symbol: str, source: str, default=None):
+        """Return a fresh cached value, or `default` when missing or expired."""
+        key = (symbol, source)
+        now = time.time()
+
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None and now - cached[1] < cached[2]:
+                self._count(source, 'hits')
+                return cached[0]
+
+            row = self._conn.execute(
+                "SELECT value, stored_at, ttl FROM responses WHERE symbol = ? AND source = ?", key
+            ).fetchone()
+
+            ttl = row[2] if row is not None and row[2] is not None else self.ttl_for(source)
+            if row is None or now - row[1] >= ttl:
+                self._count(source, 'misses')
+                return default
+
+            value = pickle.loads(row[0])
+            self._memory[key] = (value, row[1], ttl)
+            self._conn.execute(
+                "UPDATE responses SET accessed_at = ? WHERE symbol = ? AND source = ?", (now, *key)
+            )
+            self._conn.commit()
+            self._count(source, 'hits')
+            return value
+
+    def put(self, symbol: str, source: str, value):
+        """
+        Store a value (for the source's TTL, or `negative_ttl` when it is empty)
+        and evict the least recently used entries past `max_entries`.
+        """
+        key = (symbol, source)
+        now = time.time()
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        ttl = min(self.negative_ttl, self.ttl_for(source)) if is_empty(value) else None
+
+        with self._lock:
+            self._memory[key] = (value, now, ttl if ttl is not None else self.ttl_for(source))
+            exists = self._conn.execute(
+                "SELECT 1 FROM responses WHERE symbol = ? AND source = ?", key
+            ).fetchone()
+            if exists is None:
+                self._size += 1
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (symbol, source, value, stored_at, accessed_at, ttl) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (*key, blob, now, now, ttl)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def get_or_fetch(self, symbol: str, source: str, fetch):
+        """Return the cached value or call `fetch()` and cache its result. Exceptions are not cached."""
+        value = self.get(symbol, source, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        value = fetch()
+        self.put(symbol, source, value)
+        return value
+
+    def _evict(self):
+        overflow = self._size - self.max_entries
+        if overflow <= 0:
+            return
+
+        evicted = self._conn.execute(
+            "SELECT symbol, source FROM responses ORDER BY accessed_at LIMIT ?", (overflow,)
+        ).fetchall()
+        self._conn.executemany("DELETE FROM responses WHERE symbol = ? AND source = ?", evicted)
+        for key in evicted:
+            self._memory.pop(tuple(key), None)
+        self._size -= len(evicted)
+
+    def invalidate(self, symbol: str, sources: list = None):
+        """Drop cached entries for a symbol (all sources by default) so the next lookup refetches."""
+        with self._lock:
+            if sources is None:
+                cursor = self._conn.execute("DELETE FROM responses WHERE symbol = ?", (symbol,))
+            else:
+                cursor = self._conn.executemany(
+                    "DELETE FROM responses WHERE symbol = ? AND source = ?", [(symbol, s) for s in sources]
+                )
+            self._conn.commit()
+            self._size -= max(cursor.rowcount, 0)
+            self._memory = {k: v for k, v in self._memory.items()
+                            if k[0] != symbol or (sources is not None and k[1] not in sources)}
+
+    def purge_expired(self) -> int:
+        """Delete expired rows for every known source. Returns the number removed."""
+        now = time.time()
+        removed = 0
+        with self._lock:
+            for source, ttl in self.ttls.items():
+                cursor = self._conn.execute(
+                    "DELETE FROM responses WHERE source = ? AND stored_at <= ? - COALESCE(ttl, ?)", (source, now, ttl)
+                )
+                removed += cursor.rowcount
+            self._conn.commit()
+            self._size -= removed
+            self._memory = {k: v for k, v in self._memory.items() if now - v[1] < v[2]}
+        return removed
+
+    def summary(self) -> str:
+        """One-line hit/miss summary per source."""
+        parts = []
+        for source, counters in sorted(self.stats.items()):
+            total = counters['hits'] + counters['misses']
+            rate = counters['hits'] / total * 100 if total else 0
+            parts.append(f"{source}: {counters['hits']}/{total} hits ({rate:.0f}%)")
+        return ", ".join(parts) if parts else "no lookups"
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,302 @@
+"""
+🗂️ SNAPSHOT HISTORY
+Every run's records as a date-partitioned snapshot, plus an indexed revision
+log for cheap run-to-run diffs and per-ticker history
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+from exporters import record_hash
+
+HISTORY_DIR = "output/history"
+SNAPSHOT_COMPRESSION = "zstd"
+
+# Table column -> index column. Only these fields make a revision; Status 'error' rows never do
+FIELDS = {
+    'Earnings_Date': 'earnings_date',
+    'Fiscal_Quarter': 'fiscal_quarter',
+    'Last_Reported_EPS': 'last_reported_eps',
+    'EPS_Estimate': 'eps_estimate',
+    'Status': 'status',
+}
+EPS_DECIMALS = 4  # float noise below this is not a revision
+STATUS_ERROR = 'error'  # same value as earnings_table.STATUS_ERROR, without importing pandas
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS runs (
+        run_id INTEGER PRIMARY KEY,
+        started_at TEXT NOT NULL,
+        snapshot_date TEXT NOT NULL,
+        path TEXT NOT NULL,
+        tickers INTEGER NOT NULL,
+        changed INTEGER NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS revisions (
+        ticker TEXT NOT NULL,
+        run_id INTEGER NOT NULL,
+        earnings_date TEXT,
+        fiscal_quarter TEXT,
+        last_reported_eps REAL,
+        eps_estimate REAL,
+        status TEXT,
+        row_hash TEXT NOT NULL,
+        PRIMARY KEY (ticker, run_id)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_revisions_run ON revisions (run_id);
+    CREATE TABLE IF NOT EXISTS latest (
+        ticker TEXT PRIMARY KEY,
+        run_id INTEGER NOT NULL,
+        row_hash TEXT NOT NULL
+    ) WITHOUT ROWID;
+"""
+
+
+def _revision(record: dict) -> dict:
+    """The fields of a table row that are versioned, with EPS rounded."""
+    revision = {column: record.get(column) for column in FIELDS}
+    for column in ('Last_Reported_EPS', 'EPS_Estimate'):
+        if revision[column] is not None:
+            revision[column] = round(float(revision[column]), EPS_DECIMALS)
+    if revision['Status'] is not None:
+        revision['Status'] = str(revision['Status'])
+    return revision
+
+
+def _changed_fields(before: dict, after: dict) -> list:
+    if before is None:
+        return list(FIELDS)
+    return [column for column in FIELDS if before.get(column) != after.get(column)]
+
+
+class SnapshotHistory:
+    """
+    Versioned history of scraper runs.
+
+    Each run is written whole as one Parquet file under
+    `snapshots/date=YYYY-MM-DD/` (CSV.gz when no Parquet engine is installed),
+    so any past run can be reloaded. Alongside, a SQLite index keeps one
+    revision row per ticker only when its data changed, keyed by
+    (ticker, run_id) and indexed by run. Diffs and ticker histories read that
+    index alone, so their cost follows the number of changes, not the number
+    of snapshots or tickers.
+    """
+
+    def __init__(self, directory: str = HISTORY_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(os.path.join(directory, "history.sqlite"), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    # === Writing ===
+    def _write_snapshot(self, records: list, run_id: int, started_at: datetime) -> str:
+        import pandas as pd
+
+        partition = os.path.join("snapshots", f"date={started_at.strftime('%Y-%m-%d')}")
+        os.makedirs(os.path.join(self.directory, partition), exist_ok=True)
+        df = pd.DataFrame.from_records(records, columns=['Ticker', *FIELDS])
+        for column in ('Last_Reported_EPS', 'EPS_Estimate'):
+            df[column] = pd.to_numeric(df[column], errors='coerce')
+
+        try:
+            import pyarrow  # noqa: F401
+            parquet = True
+        except ImportError:
+            parquet = False
+
+        name = os.path.join(partition, f"run-{run_id:06d}.{'parquet' if parquet else 'csv.gz'}")
+        path = os.path.join(self.directory, name)
+        if parquet:
+            df.to_parquet(f"{path}.tmp", index=False, compression=SNAPSHOT_COMPRESSION)
+        else:
+            df.to_csv(f"{path}.tmp", index=False, compression='gzip')
+        os.replace(f"{path}.tmp", path)
+        return name
+
+    def record_run(self, records: list, started_at: datetime = None) -> dict:
+        """
+        Store one run's table rows (as from table_to_rows). Returns the run
+        summary, including how many tickers changed since their last revision.
+        """
+        started_at = started_at or datetime.now()
+        with self._lock:
+            run_id = (self.conn.execute("SELECT COALESCE(MAX(run_id), 0) FROM runs").fetchone()[0]) + 1
+            path = self._write_snapshot(records, run_id, started_at)
+            latest = dict(self.conn.execute("SELECT ticker, row_hash FROM latest"))
+
+            revisions = []
+            for record in records:
+                revision = _revision(record)
+                # A failed fetch says nothing about the earnings date, so it is not a revision
+                if revision['Status'] == STATUS_ERROR:
+                    continue
+                digest = record_hash(revision)
+                if latest.get(record['Ticker']) == digest:
+                    continue
+                latest[record['Ticker']] = digest
+                revisions.append((record['Ticker'], run_id, *revision.values(), digest))
+
+            with self.conn:
+                self.conn.execute(
+                    "INSERT INTO runs (run_id, started_at, snapshot_date, path, tickers, changed) VALUES (?, ?, ?, ?, ?, ?)",
+                    (run_id, started_at.isoformat(timespec='seconds'), started_at.strftime('%Y-%m-%d'),
+                     path, len(records), len(revisions))
+                )
+                self.conn.executemany(
+                    f"INSERT INTO revisions (ticker, run_id, {', '.join(FIELDS.values())}, row_hash) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    revisions
+                )
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO latest (ticker, run_id, row_hash) VALUES (?, ?, ?)",
+                    [(revision[0], run_id, revision[-1]) for revision in revisions]
+                )
+            return self.run(run_id)
+
+    # === Reading ===
+    @staticmethod
+    def _run_dict(row) -> dict:
+        return dict(zip(('run_id', 'started_at', 'snapshot_date', 'path', 'tickers', 'changed'), row))
+
+    def run(self, run_id: int) -> dict:
+        row = self.conn.execute(
+            "SELECT run_id, started_at, snapshot_date, path, tickers, changed FROM runs WHERE run_id = ?", (run_id,)
+        ).fetchone()
+        return self._run_dict(row) if row else None
+
+    def runs(self, limit: int = None) -> list:
+        """Runs, newest first."""
+        sql = "SELECT run_id, started_at, snapshot_date, path, tickers, changed FROM runs ORDER BY run_id DESC"
+        params = ()
+        if limit:
+            sql += " LIMIT ?"
+            params = (limit,)
+        return [self._run_dict(row) for row in self.conn.execute(sql, params)]
+
+    def _state(self, ticker: str, run_id: int):
+        """A ticker's data as of `run_id` (its newest revision at or before it), or None."""
+        row = self.conn.execute(
+            f"SELECT run_id, {', '.join(FIELDS.values())} FROM revisions "
+            "WHERE ticker = ? AND run_id <= ? ORDER BY run_id DESC LIMIT 1",
+            (ticker, run_id)
+        ).fetchone()
+        return (row[0], dict(zip(FIELDS, row[1:]))) if row else (None, None)
+
+    def diff_runs(self, old_run: int = None, new_run: int = None) -> list:
+        """
+        Tickers whose data differs between two runs (default: the last two).
+        Each entry has the ticker, its `before` and `after` records (None if
+        it had no data yet) and the `changed` field names. A change that was
+        reverted in between is not reported.
+        """
+        if new_run is None or old_run is None:
+            recent = [run['run_id'] for run in self.runs(limit=2)]
+            new_run = recent[0] if new_run is None and recent else new_run
+            old_run = (recent[1] if len(recent) > 1 else 0) if old_run is None else old_run
+        if new_run is None:
+            return []
+        old_run, new_run = min(old_run, new_run), max(old_run, new_run)
+
+        tickers = [row[0] for row in self.conn.execute(
+            "SELECT DISTINCT ticker FROM revisions WHERE run_id > ? AND run_id <= ? ORDER BY ticker",
+            (old_run, new_run)
+        )]
+        diffs = []
+        for ticker in tickers:
+            _, before = self._state(ticker, old_run)
+            revised_in, after = self._state(ticker, new_run)
+            changed = _changed_fields(before, after)
+            if changed:
+                diffs.append({'ticker': ticker, 'run_id': revised_in, 'before': before, 'after': after, 'changed': changed})
+        return diffs
+
+    def ticker_history(self, ticker: str) -> list:
+        """Every revision of a ticker, oldest first, with when it was seen and which fields changed."""
+        rows = self.conn.execute(
+            f"SELECT r.run_id, runs.started_at, {', '.join('r.' + column for column in FIELDS.values())} "
+            "FROM revisions r JOIN runs ON runs.run_id = r.run_id WHERE r.ticker = ? ORDER BY r.run_id",
+            (ticker.upper(),)
+        ).fetchall()
+        history = []
+        previous = None
+        for run_id, started_at, *values in rows:
+            record = dict(zip(FIELDS, values))
+            history.append({'run_id': run_id, 'started_at': started_at, 'record': record,
+                            'changed': _changed_fields(previous, record)})
+            previous = record
+        return history
+
+    def load_snapshot(self, run_id: int):
+        """A run's full snapshot as a DataFrame."""
+        import pandas as pd
+
+        run = self.run(run_id)
+        if run is None:
+            raise KeyError(f"No run {run_id}")
+        path = os.path.join(self.directory, run['path'])
+        return pd.read_parquet(path) if path.endswith('.parquet') else pd.read_csv(path)
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+# ===============================================================================
+# 🚀 CLI
+# ===============================================================================
+
+def _format_record(record: dict) -> str:
+    if record is None:
+        return "(none)"
+    return " | ".join(f"{column}: {record[column] if record[column] is not None else 'N/A'}" for column in FIELDS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Browse the earnings snapshot history")
+    parser.add_argument('--dir', default=HISTORY_DIR, help=f"history directory (default: {HISTORY_DIR})")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    runs_parser = subparsers.add_parser('runs', help="list recorded runs")
+    runs_parser.add_argument('--limit', type=int, default=20)
+    diff_parser = subparsers.add_parser('diff', help="tickers that changed between two runs (default: the last two)")
+    diff_parser.add_argument('old_run', type=int, nargs='?')
+    diff_parser.add_argument('new_run', type=int, nargs='?')
+    diff_parser.add_argument('--json', action='store_true', help="print JSON instead of text")
+    history_parser = subparsers.add_parser('history', help="revision history of one ticker")
+    history_parser.add_argument('ticker')
+    args = parser.parse_args()
+
+    history = SnapshotHistory(args.dir)
+    try:
+        if args.command == 'runs':
+            for run in history.runs(args.limit):
+                print(f"#{run['run_id']} {run['started_at']}: {run['tickers']} tickers, {run['changed']} changed "
+                      f"({run['path']})")
+        elif args.command == 'diff':
+            diffs = history.diff_runs(args.old_run, args.new_run)
+            if args.json:
+                print(json.dumps(diffs, indent=2, ensure_ascii=False))
+                return
+            print(f"🔀 {len(diffs)} tickers changed")
+            for diff in diffs:
+                print(f"{diff['ticker']} ({', '.join(diff['changed'])})")
+                print(f"  before: {_format_record(diff['before'])}")
+                print(f"  after:  {_format_record(diff['after'])}")
+        else:
+            for revision in history.ticker_history(args.ticker):
+                print(f"#{revision['run_id']} {revision['started_at']} [{', '.join(revision['changed'])}]: "
+                      f"{_format_record(revision['record'])}")
+    finally:
+        history.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+🧭 SOURCE PLANNER
+Learns which data sources keep failing for each ticker and skips them
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+SKIP_AFTER_FAILURES = 3  # consecutive misses before a source is skipped for a ticker
+EXPLORE_EVERY = 10  # retry a skipped source after this many skipped runs
+
+
+class SourcePlanner:
+    """
+    Persistent per-(ticker, source) success statistics.
+
+    `plan()` keeps the default chain order, because the order decides which
+    source wins for each field (e.g. the API consensus EPS over forwardEps).
+    It only drops sources that keep failing for that ticker. A dropped source
+    is retried in its usual place every `explore_every` runs, and the outcome
+    is recorded, so a ticker that starts answering again is picked back up.
+    """
+
+    def __init__(self, path: str, skip_after: int = SKIP_AFTER_FAILURES, explore_every: int = EXPLORE_EVERY):
+        self.path = path
+        self.skip_after = skip_after
+        self.explore_every = explore_every
+        self._lock = threading.Lock()
+        self._dirty = set()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS source_stats (
+                symbol TEXT NOT NULL,
+                source TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                successes INTEGER NOT NULL DEFAULT 0,
+                consecutive_failures INTEGER NOT NULL DEFAULT 0,
+                skipped INTEGER NOT NULL DEFAULT 0,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (symbol, source)
+            )
+        """)
+        self._conn.commit()
+
+        # Stats are small (a few rows per ticker), so keep them all in memory
+        self._stats = {
+            (symbol, source): {'attempts': attempts, 'successes': successes,
+                               'consecutive_failures': failures, 'skipped': skipped}
+            for symbol, source, attempts, successes, failures, skipped in self._conn.execute(
+                "SELECT symbol, source, attempts, successes, consecutive_failures, skipped FROM source_stats"
+            )
+        }
+
+    def _get(self, symbol: str, source: str) -> dict:
+        return self._stats.setdefault(
+            (symbol, source), {'attempts': 0, 'successes': 0, 'consecutive_failures': 0, 'skipped': 0}
+        )
+
+    def plan(self, symbol: str, stages: list) -> list:
+        """Return the stages to try for `symbol`, in the given (precedence) order."""
+        with self._lock:
+            planned = []
+            for source in stages:
+                stats = self._get(symbol, source)
+                if stats['consecutive_failures'] >= self.skip_after:
+                    if stats['skipped'] + 1 < self.explore_every:
+                        stats['skipped'] += 1
+                        self._dirty.add((symbol, source))
+                        continue
+                    # Time to explore again, in its usual place so precedence is unchanged
+                    stats['skipped'] = 0
+                    self._dirty.add((symbol, source))
+                planned.append(source)
+            return planned
+
+    def record(self, symbol: str, source: str, success: bool):
+        with self._lock:
+            stats = self._get(symbol, source)
+            stats['attempts'] += 1
+            if success:
+                stats['successes'] += 1
+                stats['consecutive_failures'] = 0
+            else:
+                stats['consecutive_failures'] += 1
+            self._dirty.add((symbol, source))
+
+    def record_skipped(self, symbol: str, source: str):
+        """The stage was not needed (higher-precedence sources filled its fields): clear its failure streak."""
+        with self._lock:
+            stats = self._get(symbol, source)
+            if stats['consecutive_failures']:
+                stats['consecutive_failures'] = 0
+                self._dirty.add((symbol, source))
+
+    def success_rate(self, symbol: str, source: str) -> float:
+        with self._lock:
+            stats = self._get(symbol, source)
+            return stats['successes'] / stats['attempts'] if stats['attempts'] else 0.0
+
+    def flush(self):
+        """Write changed stats to disk in one transaction."""
+        with self._lock:
+            if not self._dirty:
+                return
+            now = time.time()
+            rows = [
+                (symbol, source, stats['attempts'], stats['successes'],
+                 stats['consecutive_failures'], stats['skipped'], now)
+                for (symbol, source) in self._dirty
+                for stats in [self._stats[(symbol, source)]]
+            ]
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO source_stats "
+                "(symbol, source, attempts, successes, consecutive_failures, skipped, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+            self._dirty.clear()
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._conn.close()
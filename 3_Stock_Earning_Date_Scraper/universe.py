@@ -0,0 +1,46 @@
+"""
+🌐 TICKER UNIVERSE
+Load ticker lists from CSV/text files and split them into shards
+"""
+
+import csv
+import os
+
+TICKER_COLUMNS = ('ticker', 'symbol')
+
+
+def load_tickers(path: str) -> list:
+    """
+    Load tickers from a file.
+
+    - `.csv`: uses the `Ticker` or `Symbol` column (case-insensitive), otherwise the first column
+    - anything else: one ticker per line (comma/whitespace separated also works), `#` starts a comment
+
+    Tickers are upper-cased and de-duplicated, keeping file order.
+    """
+    tickers = []
+
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        if os.path.splitext(path)[1].lower() == '.csv':
+            reader = csv.reader(f)
+            header = next(reader, [])
+            normalized = [name.strip().lower() for name in header]
+            column = next((normalized.index(name) for name in TICKER_COLUMNS if name in normalized), None)
+            if column is None:
+                # No recognised header: treat the first row as data
+                column = 0
+                tickers.append(header[0] if header else '')
+            tickers.extend(row[column] for row in reader if len(row) > column)
+        else:
+            for line in f:
+                line = line.split('#', 1)[0]
+                tickers.extend(line.replace(',', ' ').split())
+
+    cleaned = (ticker.strip().upper() for ticker in tickers)
+    return list(dict.fromkeys(ticker for ticker in cleaned if ticker))
+
+
+def split_shards(tickers: list, shards: int) -> list:
+    """Split tickers round-robin into at most `shards` non-empty lists."""
+    shards = max(1, min(shards, len(tickers)))
+    return [tickers[i::shards] for i in range(shards)]
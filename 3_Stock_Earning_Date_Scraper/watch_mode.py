@@ -0,0 +1,116 @@
+"""
+👀 WATCH MODE
+Long-running refresher that re-scrapes tickers by earnings date proximity
+"""
+
+import logging
+import time
+
+from common.scheduler import DueScheduler
+from earnings_table import STATUS_ERROR, build_table, days_until, table_to_rows
+
+logger = logging.getLogger(__name__)
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# (max days until earnings, refresh interval in seconds), checked in order
+REFRESH_TIERS = [
+    (7, HOUR),        # reporting this week: hourly
+    (30, 6 * HOUR),   # this month: every 6 hours
+    (90, DAY),        # this quarter: daily
+]
+FAR_REFRESH = 7 * DAY      # months out or no date yet: weekly
+REPORTED_REFRESH = DAY     # date already passed: daily, until the next date shows up
+ERROR_REFRESH = HOUR       # fetch failed: retry soon
+BATCH_SIZE = 50            # tickers refreshed per cycle at most
+
+
+def refresh_interval(days) -> int:
+    """Seconds until a ticker with `days` until earnings should be refreshed."""
+    if days is None:
+        return FAR_REFRESH
+    if days < 0:
+        return REPORTED_REFRESH
+    for max_days, interval in REFRESH_TIERS:
+        if days <= max_days:
+            return interval
+    return FAR_REFRESH
+
+
+class EarningsWatcher(DueScheduler):
+    """
+    Keeps an earnings calendar current for a large universe.
+
+    Tickers are scheduled by their next refresh time, which depends on how
+    close their earnings date is. Each cycle scrapes only the tickers that are
+    due (bypassing the response cache for them), and the output is upserted
+    so the file is only rewritten when some record changed. If an export
+    fails (locked file, full disk), its records are kept and exported again
+    with the next cycle; the schedule is not affected.
+    """
+
+    def __init__(self, scraper, tickers: list, output_file: str, fmt: str = None,
+                 batch_size: int = BATCH_SIZE):
+        super().__init__(tickers, batch_size=batch_size)
+        self.scraper = scraper
+        self.output_file = output_file
+        self.fmt = fmt
+        self.unexported = {}  # ticker -> row from cycles whose export failed
+
+    def refresh(self, tickers: list) -> int:
+        """Scrape `tickers`, re-queue them by date proximity and upsert the output. Returns rows exported."""
+        if self.scraper.cache is not None:
+            for ticker in tickers:
+                self.scraper.cache.invalidate(ticker)
+
+        table = self.scraper.scrape_all_tickers(tickers)
+        now = time.time()
+        days = days_until(table['Earnings_Date'])
+        days = days.astype(object).where(days.notna(), None)
+        failed = table['Status'].astype(object) == STATUS_ERROR
+
+        for ticker, day_count, error in zip(table['Ticker'], days, failed):
+            interval = ERROR_REFRESH if error else refresh_interval(day_count)
+            self.schedule(ticker, now + interval)
+
+        # Tickers missing from the result (should not happen) are retried on the slowest tier
+        missing = set(tickers) - set(table['Ticker'])
+        for ticker in missing:
+            self.schedule(ticker, now + FAR_REFRESH)
+
+        return self.export(table)
+
+    def export(self, table) -> int:
+        """Upsert `table` plus any records a failed export left behind. Returns rows exported (0 on failure)."""
+        if self.unexported:
+            rows = {**self.unexported, **{row['Ticker']: row for row in table_to_rows(table)}}
+            table = build_table(list(rows.values()))
+
+        try:
+            exported = self.scraper.export(table, self.output_file, fmt=self.fmt, upsert=True)
+        except Exception as e:
+            logger.error(f"Export failed: {e}")
+            exported = False
+
+        if not exported:
+            self.unexported = {row['Ticker']: row for row in table_to_rows(table)}
+            logger.warning(f"{len(self.unexported)} records not exported; retrying with the next cycle")
+            return 0
+        self.unexported = {}
+        return len(table)
+
+    def process(self, tickers: list):
+        logger.info(f"Refreshing {len(tickers)} due tickers ({len(self)} waiting)")
+        self.refresh(tickers)
+
+    def report_error(self, tickers: list, error: Exception, delay: float):
+        logger.error(f"Refreshing {len(tickers)} tickers failed: {error} (retrying in {delay:.0f}s)")
+
+    def run(self, max_cycles: int = None) -> int:
+        """Refresh due tickers until interrupted (or for `max_cycles` refresh cycles)."""
+        logger.info(f"👀 Watching {len(self)} tickers, exporting to {self.output_file}")
+        try:
+            return super().run(max_cycles)
+        except KeyboardInterrupt:
+            logger.info("👀 Watch mode stopped")
@@ -0,0 +1,249 @@
+"""
+📏 OFFLINE BENCHMARKS
+Runs the earnings scraper, the YouTube channel loop and the weather bot at scale
+against local stand-in APIs and stores the results as JSON for comparison
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+from datetime import datetime
+
+from stand_in_server import StandInServer, add_simulation_arguments, simulation_from_args
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SCENARIOS_SCRIPT = os.path.join(BENCH_DIR, "scenarios.py")
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+DEFAULT_SIZES = {"earnings": 10000, "youtube": 5000, "weather": 1000}
+
+# Modules whose import must stay cheap: (app directory, modules that must not be loaded by importing it)
+IMPORT_CHECKS = {
+    "earnings_scraper": ("3_Stock_Earning_Date_Scraper", ("pandas", "numpy", "yfinance", "openpyxl", "requests")),
+}
+IMPORT_BUDGET_MS = 150
+IMPORT_RUNS = 5  # fresh interpreters per module; the median is reported
+
+IMPORT_PROBE = """
+import importlib, json, os, sys, time
+sys.path.insert(0, {app_dir!r})
+started = time.perf_counter()
+importlib.import_module({module!r})
+elapsed = time.perf_counter() - started
+print(json.dumps({{"ms": elapsed * 1000, "loaded": [name for name in {heavy!r} if name in sys.modules],
+                  "files": sorted(os.listdir("."))}}))
+"""
+
+# Metrics compared between runs, and whether a higher value is better
+COMPARED = {
+    "wall_s": False,
+    "items_per_s": True,
+    "requests_per_s": True,
+    "p50_ms": False,
+    "p99_ms": False,
+    "peak_rss_mb": False,
+}
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_one(server, name, size, verbose=False, keep_workdir=False):
+    """Run a scenario in a fresh process and working directory (cold caches, its own peak RSS)."""
+    server.reset_stats()
+    workdir = tempfile.mkdtemp(prefix=f"bench-{name}-")
+    output = os.path.join(workdir, "result.json")
+    command = [sys.executable, SCENARIOS_SCRIPT, name, "--base-url", server.base_url,
+               "--size", str(size), "--output", output]
+    try:
+        completed = subprocess.run(command, cwd=workdir, stdout=None if verbose else subprocess.DEVNULL)
+        if completed.returncode != 0:
+            return {"scenario": name, "size": size, "error": f"exit code {completed.returncode}"}
+        with open(output, "r", encoding="utf-8") as f:
+            result = json.load(f)
+        result["server"] = server.snapshot()["routes"]
+        return result
+    finally:
+        if keep_workdir:
+            print(f"   working directory kept: {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+def check_imports(budget_ms=IMPORT_BUDGET_MS, runs=IMPORT_RUNS):
+    """
+    Import each module in IMPORT_CHECKS in fresh interpreters and check the
+    median time against `budget_ms`, that no heavy dependency gets loaded and
+    that no file is written on import.
+    """
+    checks = {}
+    for module, (directory, heavy) in IMPORT_CHECKS.items():
+        probe = IMPORT_PROBE.format(app_dir=os.path.join(os.path.dirname(BENCH_DIR), directory),
+                                    module=module, heavy=heavy)
+        samples = []
+        for _ in range(runs):
+            workdir = tempfile.mkdtemp(prefix="bench-import-")
+            try:
+                completed = subprocess.run([sys.executable, "-c", probe], cwd=workdir,
+                                           capture_output=True, text=True)
+            finally:
+                shutil.rmtree(workdir, ignore_errors=True)
+            if completed.returncode != 0:
+                samples = None
+                break
+            samples.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+        if samples is None:
+            checks[module] = {"ok": False, "error": completed.stderr.strip().splitlines()[-1:]}
+            continue
+        times = sorted(sample["ms"] for sample in samples)
+        loaded = sorted({name for sample in samples for name in sample["loaded"]})
+        files = sorted({name for sample in samples for name in sample["files"]})
+        median = times[len(times) // 2]
+        checks[module] = {
+            "median_ms": round(median, 1),
+            "budget_ms": budget_ms,
+            "heavy_modules_loaded": loaded,
+            "files_created": files,
+            "ok": median <= budget_ms and not loaded and not files,
+        }
+    return checks
+
+
+def print_imports(checks):
+    for module, check in checks.items():
+        if "error" in check:
+            print(f"❌ import {module}: failed {check['error']}")
+            continue
+        mark = "✅" if check["ok"] else "❌"
+        extra = ""
+        if check["heavy_modules_loaded"]:
+            extra += f" | loaded {', '.join(check['heavy_modules_loaded'])}"
+        if check["files_created"]:
+            extra += f" | created {', '.join(check['files_created'])}"
+        print(f"{mark} import {module}: {check['median_ms']} ms (budget {check['budget_ms']} ms){extra}")
+
+
+def _flat(result):
+    latency = result.get("latency_ms", {})
+    return {**result, "p50_ms": latency.get("p50"), "p99_ms": latency.get("p99")}
+
+
+def print_result(result):
+    if "error" in result:
+        print(f"❌ {result['scenario']}: {result['error']}")
+        return
+    flat = _flat(result)
+    statuses = ", ".join(f"{status}: {count}" for status, count in sorted(result["statuses"].items()))
+    print(f"✅ {result['scenario']}: {result['completed']}/{result['size']} {result['unit']} in {result['wall_s']:.2f}s "
+          f"({result['items_per_s']}/s) | {result['requests']} requests, {result['requests_per_s']} req/s | "
+          f"p50 {flat['p50_ms']} ms, p99 {flat['p99_ms']} ms | peak RSS {result['peak_rss_mb']} MB | "
+          f"import {result['import_s']:.2f}s")
+    print(f"   statuses: {statuses}")
+
+
+def compare(results, baseline, max_regression=None):
+    """Print the change of every compared metric against a baseline run. Returns the regressions."""
+    regressions = []
+    print(f"\n📊 Compared with {baseline.get('created_at')} ({baseline.get('git_commit') or 'unknown commit'})")
+    for name, result in results["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before or "error" in before or "error" in result:
+            continue
+        if before.get("size") != result.get("size"):
+            print(f"   {name}: sizes differ ({before.get('size')} vs {result.get('size')}), skipped")
+            continue
+        old, new = _flat(before), _flat(result)
+        parts = []
+        for metric, higher_is_better in COMPARED.items():
+            if not old.get(metric) or new.get(metric) is None:
+                continue
+            change = (new[metric] - old[metric]) / old[metric]
+            worse = -change if higher_is_better else change
+            flag = ""
+            if max_regression is not None and worse > max_regression:
+                flag = " ⚠️"
+                regressions.append((name, metric, change))
+            parts.append(f"{metric} {old[metric]} → {new[metric]} ({change:+.1%}){flag}")
+        print(f"   {name}: " + " | ".join(parts))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the apps against local stand-in APIs")
+    parser.add_argument("scenarios", nargs="*", choices=[[]] + sorted(DEFAULT_SIZES),
+                        help="scenarios to run (default: all)")
+    parser.add_argument("--tickers", type=int, default=DEFAULT_SIZES["earnings"])
+    parser.add_argument("--channels", type=int, default=DEFAULT_SIZES["youtube"])
+    parser.add_argument("--cities", type=int, default=DEFAULT_SIZES["weather"])
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every size, e.g. 0.01 for a quick run")
+    add_simulation_arguments(parser)
+    parser.add_argument("--results-dir", default=RESULTS_DIR)
+    parser.add_argument("--compare", metavar="RESULTS_JSON", help="earlier results file to compare against")
+    parser.add_argument("--max-regression", type=float,
+                        help="with --compare, exit with status 1 if a metric got worse by more than this fraction")
+    parser.add_argument("--import-budget-ms", type=float, default=IMPORT_BUDGET_MS,
+                        help=f"fail if a checked module takes longer to import (default: {IMPORT_BUDGET_MS})")
+    parser.add_argument("--verbose", action="store_true", help="show the apps' own output")
+    parser.add_argument("--keep-workdir", action="store_true", help="keep each scenario's working directory")
+    args = parser.parse_args()
+
+    sizes = {"earnings": args.tickers, "youtube": args.channels, "weather": args.cities}
+    sizes = {name: max(1, int(size * args.scale)) for name, size in sizes.items()}
+    scenarios = args.scenarios or sorted(DEFAULT_SIZES)
+
+    print("⏱️ Import budget")
+    imports = check_imports(args.import_budget_ms)
+    print_imports(imports)
+
+    server = StandInServer(simulation=simulation_from_args(args))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"🧪 Stand-in APIs on {server.base_url} ({server.simulation.as_dict()})")
+
+    results = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "simulation": server.simulation.as_dict(),
+        "imports": imports,
+        "scenarios": {},
+    }
+    try:
+        for name in scenarios:
+            print(f"🏁 {name}: {sizes[name]}")
+            result = run_one(server, name, sizes[name], args.verbose, args.keep_workdir)
+            results["scenarios"][name] = result
+            print_result(result)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    os.makedirs(args.results_dir, exist_ok=True)
+    path = os.path.join(args.results_dir, f"bench-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"💾 Results saved: {path}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.max_regression)
+        if regressions:
+            print(f"❌ {len(regressions)} metrics regressed by more than {args.max_regression:.0%}")
+            return 1
+    failed = any("error" in result for result in results["scenarios"].values())
+    return 1 if failed or not all(check["ok"] for check in imports.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+"""
+🏁 BENCHMARK SCENARIOS
+Each app's pipeline at scale against the stand-in server, one scenario per process
+so peak memory and imported modules are measured per app
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from common.http_client import get_client
+from standins import StandInYFinance, transcript_fetcher
+
+EARNINGS_RATE = float(os.getenv("BENCH_EARNINGS_RPS", "10000"))  # scraper's own limiter; the default is effectively off
+
+
+def _use_app(directory):
+    sys.path.insert(0, os.path.join(ROOT, directory))
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+class RequestRecorder:
+    """HttpClient observer collecting the latency and status of every attempt."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = []
+        self.statuses = {}
+
+    def __call__(self, method, url, status, elapsed):
+        with self._lock:
+            self.latencies.append(elapsed)
+            key = str(status) if status is not None else "error"
+            self.statuses[key] = self.statuses.get(key, 0) + 1
+
+    def summary(self, wall):
+        latencies = sorted(self.latencies)
+        return {
+            "requests": len(latencies),
+            "requests_per_s": round(len(latencies) / wall, 1) if wall else None,
+            "latency_ms": {
+                name: round(value * 1000, 2) if value is not None else None
+                for name, value in (("p50", percentile(latencies, 0.50)), ("p90", percentile(latencies, 0.90)),
+                                    ("p99", percentile(latencies, 0.99)), ("max", latencies[-1] if latencies else None))
+            },
+            "statuses": self.statuses,
+        }
+
+
+# === Scenarios: setup(base_url, size) imports the app and returns run(), which returns the items completed ===
+def setup_weather(base_url, size):
+    os.environ["OPENWEATHER_BASE_URL"] = base_url
+    _use_app("1_weather_alart")
+    import weather_bot
+
+    cities = [f"Bench City {i:05d}" for i in range(size)]
+
+    def run():
+        # fetch_weather: city ID lookups, batched group calls and per-city forecasts, then every alert rendered
+        weather_list = weather_bot.fetch_weather(cities)
+        for weather_data in weather_list:
+            weather_bot.format_weather_message(weather_data)
+        return sum(1 for weather_data in weather_list if weather_data)
+    return run
+
+
+def setup_youtube(base_url, size):
+    os.environ.update(
+        YOUTUBE_API_BASE=f"{base_url}/youtube/v3",
+        YOUTUBE_FEED_URL=f"{base_url}/feeds/videos.xml",
+        YOUTUBE_API_KEY="benchmark",
+    )
+    _use_app("2_YouTube_NewVideo_Transcript")
+    import main as youtube_main
+    import transcripts
+    from watcher import YouTubeWatcher
+
+    transcripts._fetch_entries = transcript_fetcher(base_url)
+    channel_ids = [f"UCbench{i:017d}" for i in range(size)]
+
+    def run():
+        # The main.py run: poll every channel, fetch and archive transcripts, write the outputs
+        watcher = YouTubeWatcher(history_file=None)
+        try:
+            new_videos = watcher.poll(channel_ids)
+        finally:
+            watcher.close()
+        youtube_main.write_outputs(new_videos)
+        return len(new_videos)
+    return run
+
+
+def setup_earnings(base_url, size):
+    os.environ["YAHOO_QUERY_URL"] = base_url
+    _use_app("3_Stock_Earning_Date_Scraper")
+    import logging
+    import earnings_scraper
+
+    logging.getLogger().setLevel(logging.WARNING)  # one INFO line per ticker stage would dominate the run
+    earnings_scraper.yf = StandInYFinance(base_url)
+    tickers = [f"BM{i:05d}" for i in range(size)]
+
+    def run():
+        scraper = earnings_scraper.EarningsScraper(requests_per_second=EARNINGS_RATE,
+                                                   burst=max(1, int(EARNINGS_RATE)))
+        return len(scraper.scrape_all_tickers(tickers))
+    return run
+
+
+SCENARIOS = {
+    "earnings": ("tickers", setup_earnings),
+    "youtube": ("channels", setup_youtube),
+    "weather": ("cities", setup_weather),
+}
+
+
+def run_scenario(name, base_url, size):
+    unit, setup = SCENARIOS[name]
+    started = time.perf_counter()
+    run = setup(base_url, size)
+    import_s = time.perf_counter() - started
+
+    recorder = RequestRecorder()
+    get_client().add_observer(recorder)
+    started = time.perf_counter()
+    completed = run()
+    wall = time.perf_counter() - started
+    get_client().remove_observer(recorder)
+
+    return {
+        "scenario": name,
+        "size": size,
+        "unit": unit,
+        "completed": completed,
+        "import_s": round(import_s, 3),
+        "wall_s": round(wall, 3),
+        "items_per_s": round(size / wall, 1) if wall else None,
+        **recorder.summary(wall),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run one benchmark scenario (started by run_benchmarks.py)")
+    parser.add_argument("scenario", choices=sorted(SCENARIOS))
+    parser.add_argument("--base-url", required=True, help="stand-in server URL")
+    parser.add_argument("--size", type=int, required=True)
+    parser.add_argument("--output", required=True, help="where to write the JSON result")
+    args = parser.parse_args()
+
+    result = run_scenario(args.scenario, args.base_url, args.size)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,374 @@
+"""
+🧪 STAND-IN API SERVER
+Local replacement for OpenWeatherMap, the YouTube Data API and Yahoo Finance,
+replaying recorded fixtures with configurable latency, errors and throttling
+"""
+
+import argparse
+import copy
+import json
+import os
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), "r", encoding="utf-8") as f:
+        return f.read() if name.endswith(".xml") else json.load(f)
+
+
+def _seed(value):
+    """Stable number for an ID, so every run serves the same data for it."""
+    return zlib.crc32(str(value).encode("utf-8"))
+
+
+class SimulationConfig:
+    """How the stand-in misbehaves: latency, random 5xx errors and a global request-rate limit (429)."""
+
+    def __init__(self, latency_ms=20.0, jitter_ms=10.0, error_rate=0.0, throttle_rps=0.0, retry_after=1):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.throttle_rps = throttle_rps
+        self.retry_after = retry_after
+        self._tokens = throttle_rps
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def as_dict(self):
+        return {
+            "latency_ms": self.latency_ms,
+            "jitter_ms": self.jitter_ms,
+            "error_rate": self.error_rate,
+            "throttle_rps": self.throttle_rps,
+            "retry_after": self.retry_after,
+        }
+
+    def delay(self):
+        return max(self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms), 0.0) / 1000
+
+    def throttled(self):
+        """Token bucket holding one second of requests; True when this request is over the limit."""
+        if self.throttle_rps <= 0:
+            return False
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.throttle_rps, self._tokens + (now - self._updated) * self.throttle_rps)
+            self._updated = now
+            if self._tokens < 1:
+                return True
+            self._tokens -= 1
+            return False
+
+    def failed(self):
+        return self.error_rate > 0 and random.random() < self.error_rate
+
+
+class Fixtures:
+    """Builds responses for any requested ID from one recorded response per endpoint."""
+
+    def __init__(self):
+        self.weather = load_fixture("openweather_weather.json")
+        self.forecast_item = load_fixture("openweather_forecast_item.json")
+        self.playlist_item = load_fixture("youtube_playlist_item.json")
+        self.feed_entry = load_fixture("youtube_feed_entry.xml")
+        self.timedtext = json.dumps(load_fixture("youtube_timedtext.json"), ensure_ascii=False).encode("utf-8")
+        self.calendar_row = load_fixture("yahoo_calendar_row.json")
+        self.quote_summary = load_fixture("yahoo_quote_summary.json")
+
+    # === OpenWeatherMap ===
+    @staticmethod
+    def city_id(name):
+        return 1000000 + _seed(name.casefold()) % 9000000
+
+    def current(self, city_id, name=None):
+        seed = _seed(city_id)
+        data = copy.deepcopy(self.weather)
+        data["id"] = city_id
+        data["name"] = name or f"City {city_id}"
+        data["main"]["temp"] = round(-10 + seed % 450 / 10, 1)
+        data["main"]["feels_like"] = round(data["main"]["temp"] - seed % 40 / 10, 1)
+        data["main"]["humidity"] = 30 + seed % 70
+        if seed % 3:
+            data["weather"][0].update(id=800, main="Clear", description="clear sky", icon="01d")
+            del data["rain"]
+        data["dt"] = int(time.time()) // 600 * 600
+        return data
+
+    def forecast(self, city_id):
+        seed = _seed(city_id)
+        start = int(time.time()) // 10800 * 10800 + 10800
+        items = []
+        for step in range(40):
+            item = copy.deepcopy(self.forecast_item)
+            item["dt"] = start + step * 10800
+            item["main"]["temp"] = round(-10 + (seed + step * 7) % 450 / 10, 1)
+            item["main"]["feels_like"] = round(item["main"]["temp"] - 1.5, 1)
+            item["pop"] = (seed >> step % 16) % 100 / 100
+            item["rain"]["3h"] = round(item["pop"] * 3, 2)
+            item["wind"]["gust"] = round((seed + step) % 200 / 10, 1)
+            items.append(item)
+        return {"cod": "200", "message": 0, "cnt": len(items), "list": items,
+                "city": {"id": city_id, "name": f"City {city_id}", "timezone": (seed % 24 - 12) * 3600}}
+
+    # === YouTube ===
+    @staticmethod
+    def video_ids(channel_id, count):
+        seed = _seed(channel_id)
+        return [f"v{(seed + i) % 10 ** 10:010d}" for i in range(count)]
+
+    def playlist_items(self, playlist_id, max_results):
+        channel_id = "UC" + playlist_id[2:]
+        items = []
+        for position, video_id in enumerate(self.video_ids(channel_id, max_results)):
+            item = copy.deepcopy(self.playlist_item)
+            published = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(time.time() - (position + 1) * 86400))
+            item["snippet"].update(channelId=channel_id, playlistId=playlist_id, position=position,
+                                   channelTitle=f"Channel {channel_id[-6:]}", videoOwnerChannelId=channel_id,
+                                   videoOwnerChannelTitle=f"Channel {channel_id[-6:]}", publishedAt=published,
+                                   title=f"{item['snippet']['title']} #{position}")
+            item["snippet"]["resourceId"]["videoId"] = video_id
+            item["contentDetails"] = {"videoId": video_id, "videoPublishedAt": published}
+            items.append(item)
+        return {"kind": "youtube#playlistItemListResponse", "items": items,
+                "pageInfo": {"totalResults": len(items), "resultsPerPage": max_results}}
+
+    def search(self, channel_id, max_results):
+        items = [
+            {"kind": "youtube#searchResult", "id": {"kind": "youtube#video", "videoId": item["contentDetails"]["videoId"]},
+             "snippet": item["snippet"]}
+            for item in self.playlist_items("UU" + channel_id[2:], max_results)["items"]
+        ]
+        return {"kind": "youtube#searchListResponse", "items": items}
+
+    def feed(self, channel_id, max_results=15):
+        entries = []
+        for position, video_id in enumerate(self.video_ids(channel_id, max_results)):
+            entries.append(self.feed_entry.format(
+                video_id=video_id, channel_id=channel_id, channel_name=f"Channel {channel_id[-6:]}",
+                title=f"Weekly market recap #{position}",
+                published=time.strftime("%Y-%m-%dT%H:%M:%S+00:00", time.gmtime(time.time() - (position + 1) * 86400)),
+            ))
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<feed xmlns:yt="http://www.youtube.com/xml/schemas/2015" '
+            'xmlns:media="http://search.yahoo.com/mrss/" xmlns="http://www.w3.org/2005/Atom">\n'
+            f" <title>Channel {channel_id[-6:]}</title>\n" + "".join(entries) + "</feed>\n"
+        )
+
+    # === Yahoo Finance ===
+    def calendar(self, symbols):
+        rows = []
+        for symbol in symbols:
+            seed = _seed(symbol)
+            if seed % 10 == 0:
+                continue  # not every ticker has a calendar entry, so the fallback stages run too
+            row = copy.deepcopy(self.calendar_row)
+            row.update(ticker=symbol, companyshortname=f"{symbol} Inc.", quarter=seed % 4 + 1,
+                       earningsDate=time.strftime("%Y-%m-%d", time.gmtime(time.time() + (seed % 90 + 1) * 86400)))
+            row["epsEstimate"] = {"raw": seed % 500 / 100, "fmt": f"{seed % 500 / 100:.2f}"}
+            rows.append(row)
+        return {"earnings": {"result": rows, "error": None}}
+
+    def quote_summary_for(self, symbol, modules):
+        seed = _seed(symbol)
+        summary = {module: copy.deepcopy(self.quote_summary[module]) for module in modules if module in self.quote_summary}
+        if "calendarEvents" in summary:
+            earnings_at = int(time.time()) // 86400 * 86400 + (seed % 90 + 1) * 86400
+            summary["calendarEvents"]["earnings"]["earningsDate"] = [
+                {"raw": earnings_at, "fmt": time.strftime("%Y-%m-%d", time.gmtime(earnings_at))}
+            ]
+        if "defaultKeyStatistics" in summary:
+            summary["defaultKeyStatistics"]["forwardEps"]["raw"] = seed % 800 / 100
+            summary["defaultKeyStatistics"]["trailingEps"]["raw"] = seed % 600 / 100
+        return {"quoteSummary": {"result": [summary], "error": None}}
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real APIs
+    disable_nagle_algorithm = True  # headers and body are separate writes; don't let them wait on delayed ACKs
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, content_type="application/json", headers=None):
+        if not isinstance(body, bytes):
+            body = body.encode("utf-8") if isinstance(body, str) else json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.count(self.route, status)
+
+    def do_POST(self):
+        self.route = urlsplit(self.path).path
+        if self.route == "/_reset":
+            self.server.reset_stats()
+            return self._send(200, {"ok": True})
+        return self._send(404, {"error": "not found"})
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        self.route = parts.path
+        query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        if self.route == "/_stats":
+            return self._send(200, self.server.snapshot())
+
+        handler = self.server.routes.get(self.route)
+        if handler is None and self.route.startswith("/v10/finance/quoteSummary/"):
+            handler = StandInHandler.quote_summary
+        if handler is None:
+            return self._send(404, {"error": "not found"})
+
+        simulation = self.server.simulation
+        if simulation.throttled():
+            return self._send(429, {"error": "Too Many Requests"}, headers={"Retry-After": str(simulation.retry_after)})
+        time.sleep(simulation.delay())
+        if simulation.failed():
+            return self._send(503, {"error": "Service Unavailable"})
+        return handler(self, query)
+
+    # === Routes ===
+    def weather(self, query):
+        name = query.get("q") or ""
+        city_id = int(query["id"]) if "id" in query else Fixtures.city_id(name)
+        return self._send(200, self.server.fixtures.current(city_id, name or None))
+
+    def group(self, query):
+        ids = [int(city_id) for city_id in query.get("id", "").split(",") if city_id]
+        items = [self.server.fixtures.current(city_id) for city_id in ids]
+        return self._send(200, {"cnt": len(items), "list": items})
+
+    def forecast(self, query):
+        return self._send(200, self.server.fixtures.forecast(int(query["id"])))
+
+    def channels(self, query):
+        items = [
+            {"kind": "youtube#channel", "id": channel_id,
+             "contentDetails": {"relatedPlaylists": {"likes": "", "uploads": "UU" + channel_id[2:]}}}
+            for channel_id in query.get("id", "").split(",") if channel_id
+        ]
+        return self._send(200, {"kind": "youtube#channelListResponse", "items": items,
+                                "pageInfo": {"totalResults": len(items), "resultsPerPage": len(items)}})
+
+    def playlist_items(self, query):
+        return self._send(200, self.server.fixtures.playlist_items(query["playlistId"], int(query.get("maxResults", 5))))
+
+    def search(self, query):
+        return self._send(200, self.server.fixtures.search(query["channelId"], int(query.get("maxResults", 5))))
+
+    def videos(self, query):
+        items = [
+            {"kind": "youtube#video", "id": video_id,
+             "snippet": {"title": f"Video {video_id}", "liveBroadcastContent": "none"}}
+            for video_id in query.get("id", "").split(",") if video_id
+        ]
+        return self._send(200, {"kind": "youtube#videoListResponse", "items": items})
+
+    def feed(self, query):
+        return self._send(200, self.server.fixtures.feed(query["channel_id"]), content_type="application/atom+xml")
+
+    def timedtext(self, query):
+        return self._send(200, self.server.fixtures.timedtext)
+
+    def calendar(self, query):
+        symbols = [symbol for symbol in query.get("symbol", "").split(",") if symbol]
+        return self._send(200, self.server.fixtures.calendar(symbols))
+
+    def quote_summary(self, query):
+        symbol = self.route.rsplit("/", 1)[-1]
+        modules = query.get("modules", "").split(",")
+        return self._send(200, self.server.fixtures.quote_summary_for(symbol, modules))
+
+
+ROUTES = {
+    "/data/2.5/weather": StandInHandler.weather,
+    "/data/2.5/group": StandInHandler.group,
+    "/data/2.5/forecast": StandInHandler.forecast,
+    "/youtube/v3/channels": StandInHandler.channels,
+    "/youtube/v3/playlistItems": StandInHandler.playlist_items,
+    "/youtube/v3/search": StandInHandler.search,
+    "/youtube/v3/videos": StandInHandler.videos,
+    "/feeds/videos.xml": StandInHandler.feed,
+    "/api/timedtext": StandInHandler.timedtext,
+    "/v7/finance/calendar/earnings": StandInHandler.calendar,
+}
+
+
+class StandInServer(ThreadingHTTPServer):
+    """Threaded HTTP server that serves every stand-in API and counts responses per route and status."""
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, address=("127.0.0.1", 0), simulation=None):
+        super().__init__(address, StandInHandler)
+        self.simulation = simulation or SimulationConfig()
+        self.fixtures = Fixtures()
+        self.routes = ROUTES
+        self._stats_lock = threading.Lock()
+        self._stats = {}
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, route, status):
+        with self._stats_lock:
+            by_status = self._stats.setdefault(route, {})
+            by_status[str(status)] = by_status.get(str(status), 0) + 1
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self._stats = {}
+
+    def snapshot(self):
+        with self._stats_lock:
+            stats = {route: dict(by_status) for route, by_status in self._stats.items() if not route.startswith("/_")}
+        return {"simulation": self.simulation.as_dict(), "routes": stats}
+
+
+def add_simulation_arguments(parser):
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="mean response latency (default: 20)")
+    parser.add_argument("--jitter-ms", type=float, default=10.0, help="latency spread, +/- (default: 10)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--throttle-rps", type=float, default=0.0,
+                        help="requests/sec before answering 429 with Retry-After (default: 0 = off)")
+
+
+def simulation_from_args(args):
+    return SimulationConfig(args.latency_ms, args.jitter_ms, args.error_rate, args.throttle_rps)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve stand-in OpenWeatherMap, YouTube and Yahoo Finance APIs")
+    parser.add_argument("--port", type=int, default=8765)
+    add_simulation_arguments(parser)
+    args = parser.parse_args()
+
+    server = StandInServer(("127.0.0.1", args.port), simulation_from_args(args))
+    print(f"🧪 Stand-in APIs on {server.base_url}")
+    print(f"   OPENWEATHER_BASE_URL={server.base_url}")
+    print(f"   YOUTUBE_API_BASE={server.base_url}/youtube/v3")
+    print(f"   YOUTUBE_FEED_URL={server.base_url}/feeds/videos.xml")
+    print(f"   YAHOO_QUERY_URL={server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Stand-in server stopped")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+🧪 CLIENT LIBRARY STAND-INS
+yfinance and youtube-transcript-api talk to Yahoo and YouTube through their own
+HTTP stacks with fixed hosts, so benchmarks swap them for these small
+replacements that fetch the same data from the stand-in server instead
+"""
+
+from datetime import datetime, timezone
+
+from common.http_client import get_client
+
+
+def _raw(value):
+    return value.get("raw") if isinstance(value, dict) else value
+
+
+class StandInTicker:
+    """The parts of yfinance.Ticker the earnings scraper reads: calendar, info and quarterly_earnings."""
+
+    def __init__(self, base_url, symbol):
+        self.base_url = base_url
+        self.symbol = symbol
+
+    def _summary(self, *modules):
+        url = f"{self.base_url}/v10/finance/quoteSummary/{self.symbol}"
+        response = get_client().get(url, params={"modules": ",".join(modules)})
+        response.raise_for_status()
+        return response.json()["quoteSummary"]["result"][0]
+
+    @property
+    def calendar(self):
+        earnings = self._summary("calendarEvents")["calendarEvents"]["earnings"]
+        return {
+            "Earnings Date": [datetime.fromtimestamp(item["raw"], timezone.utc).date() for item in earnings["earningsDate"]],
+            "Earnings Average": _raw(earnings.get("earningsAverage")),
+            "Earnings Low": _raw(earnings.get("earningsLow")),
+            "Earnings High": _raw(earnings.get("earningsHigh")),
+        }
+
+    @property
+    def info(self):
+        summary = self._summary("defaultKeyStatistics", "calendarEvents")
+        info = {key: _raw(value) for key, value in summary["defaultKeyStatistics"].items()}
+        info["symbol"] = self.symbol
+        return info
+
+    @property
+    def quarterly_earnings(self):
+        import pandas as pd  # only the earnings benchmark needs pandas; keeps it out of the others' peak RSS
+
+        quarters = self._summary("earnings")["earnings"]["earningsChart"]["quarterly"]
+        # Most recent quarter first
+        return pd.DataFrame(
+            {"Earnings": [_raw(quarter["actual"]) for quarter in reversed(quarters)]},
+            index=[quarter["date"] for quarter in reversed(quarters)],
+        )
+
+
+class StandInYFinance:
+    """Drop-in for the `yf` module inside earnings_scraper."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+
+    def Ticker(self, symbol):
+        return StandInTicker(self.base_url, symbol)
+
+
+def transcript_fetcher(base_url):
+    """Replacement for transcripts._fetch_entries that reads json3 timed text from the stand-in server."""
+    def fetch_entries(video_id, languages):
+        response = get_client().get(f"{base_url}/api/timedtext", params={"v": video_id, "lang": languages[0], "fmt": "json3"})
+        response.raise_for_status()
+        for event in response.json()["events"]:
+            text = "".join(seg["utf8"] for seg in event.get("segs", []))
+            if text.strip():
+                yield text, event["tStartMs"] / 1000, event.get("dDurationMs", 0) / 1000
+    return fetch_entries
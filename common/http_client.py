@@ -0,0 +1,180 @@
+"""
+🌐 SHARED HTTP CLIENT
+Pooled keep-alive sessions with timeouts, retries and jittered backoff
+"""
+
+import asyncio
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_TIMEOUT = (5, 20)  # (connect, read) seconds
+MAX_RETRIES = 4
+BACKOFF_BASE = 0.5  # seconds; doubled on every attempt
+BACKOFF_CAP = 30.0  # computed backoff never waits longer than this between attempts
+MAX_RETRY_AFTER = 300.0  # longest server-requested wait honored; beyond it the response is returned
+POOL_SIZE = 32  # keep-alive connections per host
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def parse_retry_after(value: str):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date), or None."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class HttpClient:
+    """
+    Thread-safe HTTP client with one pooled `requests.Session` per host.
+
+    Connections are kept alive and reused, every request gets a timeout, and
+    connection errors, timeouts, 429 and 5xx responses are retried with
+    full-jitter exponential backoff. A Retry-After header replaces the computed
+    backoff and is honored in full up to `max_retry_after` seconds; a longer
+    one is not waited out, and the response is returned at once. When retries
+    run out the last response is returned (or the last exception raised), so
+    callers keep their own status handling.
+
+    A `limiter` passed to `request` (anything with `acquire()`, such as a token
+    bucket) is called before every attempt, retries included, so a shared rate
+    limit holds even while requests are being retried.
+
+    Observers added with `add_observer` are called after every attempt, which
+    lets benchmarks and metrics see each request without wrapping the client.
+    """
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, max_retries: int = MAX_RETRIES,
+                 backoff_base: float = BACKOFF_BASE, backoff_cap: float = BACKOFF_CAP,
+                 max_retry_after: float = MAX_RETRY_AFTER, pool_size: int = POOL_SIZE, headers: dict = None):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.max_retry_after = max_retry_after
+        self.pool_size = pool_size
+        self.headers = dict(headers or {})
+        self._sessions = {}
+        self._observers = ()
+        self._lock = threading.Lock()
+
+    def session_for(self, url: str) -> requests.Session:
+        parts = urlsplit(url)
+        key = f"{parts.scheme}://{parts.netloc}"
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=0)
+                session.mount(f"{parts.scheme}://", adapter)
+                session.headers.update(self.headers)
+                self._sessions[key] = session
+            return session
+
+    def add_observer(self, observer):
+        """Call `observer(method, url, status, elapsed)` after every attempt (status is None when it raised)."""
+        with self._lock:
+            self._observers = self._observers + (observer,)
+
+    def remove_observer(self, observer):
+        with self._lock:
+            self._observers = tuple(o for o in self._observers if o is not observer)
+
+    def _notify(self, method: str, url: str, status, started: float):
+        elapsed = time.perf_counter() - started
+        for observer in self._observers:
+            observer(method, url, status, elapsed)
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter delay for the given retry attempt (0-based)."""
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+
+    def request(self, method: str, url: str, limiter=None, **kwargs) -> requests.Response:
+        kwargs.setdefault('timeout', self.timeout)
+        session = self.session_for(url)
+
+        for attempt in range(self.max_retries + 1):
+            last_attempt = attempt == self.max_retries
+            if limiter is not None:
+                limiter.acquire()
+            started = time.perf_counter()
+            try:
+                response = session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                self._notify(method, url, None, started)
+                if last_attempt:
+                    raise
+                time.sleep(self.backoff(attempt))
+                continue
+
+            self._notify(method, url, response.status_code, started)
+            if response.status_code not in RETRY_STATUSES or last_attempt:
+                return response
+
+            delay = parse_retry_after(response.headers.get('Retry-After'))
+            if delay is not None and delay > self.max_retry_after:
+                # Retrying sooner than the server asked would only earn another 429
+                return response
+            response.close()
+            time.sleep(delay if delay is not None else self.backoff(attempt))
+
+    def get(self, url: str, limiter=None, **kwargs) -> requests.Response:
+        return self.request('GET', url, limiter=limiter, **kwargs)
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+class AsyncHttpClient:
+    """
+    Async front end for concurrent callers.
+
+    Requests run on worker threads through the same pooled sessions and retry
+    policy as HttpClient; `concurrency` bounds how many are in flight at once.
+    """
+
+    def __init__(self, client: HttpClient = None, concurrency: int = POOL_SIZE):
+        self.client = client or get_client()
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    async def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        async with self._semaphore:
+            return await asyncio.to_thread(self.client.request, method, url, **kwargs)
+
+    async def get(self, url: str, **kwargs) -> requests.Response:
+        return await self.request('GET', url, **kwargs)
+
+    async def get_many(self, urls: list, **kwargs) -> list:
+        """GET every URL concurrently; results keep the input order (exceptions are returned, not raised)."""
+        return await asyncio.gather(*(self.get(url, **kwargs) for url in urls), return_exceptions=True)
+
+
+_default_client = None
+_default_lock = threading.Lock()
+
+
+def get_client() -> HttpClient:
+    """Process-wide shared client, so every caller reuses the same connection pools."""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = HttpClient()
+        return _default_client
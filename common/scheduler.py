@@ -0,0 +1,87 @@
+"""
+⏰ SHARED DUE-TIME SCHEDULER
+Min-heap of keys by next due time plus the batch run loop used by the watch modes
+"""
+
+import heapq
+import time
+
+IDLE_SLEEP = 60  # upper bound on a single sleep, so shutdown stays responsive
+RETRY_BACKOFF = 60  # first delay before a failed batch is retried; doubled per consecutive failure
+MAX_RETRY_BACKOFF = 30 * 60
+
+
+class DueScheduler:
+    """
+    Runs keys (tickers, channels, ...) on their own schedules.
+
+    Keys sit in a min-heap keyed by when they are next due; every key starts
+    due immediately. Each cycle pops the due keys (at most `batch_size`) and
+    hands them to `process()`, which does the work and re-queues each key with
+    `schedule()`. If `process()` raises, the error is reported and the keys it
+    did not re-queue are retried after a backoff that doubles with every
+    consecutive failed batch, so an outage does not end the loop. Between
+    cycles the loop sleeps until the next key is due, in steps of at most
+    `idle_sleep` seconds.
+    """
+
+    def __init__(self, keys, batch_size=None, idle_sleep=IDLE_SLEEP,
+                 retry_backoff=RETRY_BACKOFF, max_retry_backoff=MAX_RETRY_BACKOFF):
+        self.batch_size = batch_size
+        self.idle_sleep = idle_sleep
+        self.retry_backoff = retry_backoff
+        self.max_retry_backoff = max_retry_backoff
+        self.failures = 0  # consecutive failed batches
+        self.queue = [(0.0, key) for key in dict.fromkeys(keys)]
+        heapq.heapify(self.queue)
+
+    def __len__(self):
+        return len(self.queue)
+
+    def schedule(self, key, due_at):
+        heapq.heappush(self.queue, (due_at, key))
+
+    def due(self, now):
+        """Pop the keys due at `now`, earliest first (at most `batch_size`)."""
+        due = []
+        while self.queue and self.queue[0][0] <= now and (self.batch_size is None or len(due) < self.batch_size):
+            due.append(heapq.heappop(self.queue)[1])
+        return due
+
+    def process(self, keys):
+        """Handle one batch of due keys and re-queue them. Implemented by subclasses."""
+        raise NotImplementedError
+
+    def report_error(self, keys, error, delay):
+        print(f"⚠️ Batch of {len(keys)} failed: {error} (retrying in {delay:.0f}s)")
+
+    def _retry_later(self, keys, error):
+        self.failures += 1
+        delay = min(self.retry_backoff * 2 ** (self.failures - 1), self.max_retry_backoff)
+        self.report_error(keys, error, delay)
+        # process() may have re-queued some keys before it failed
+        queued = {key for _, key in self.queue}
+        due_at = time.time() + delay
+        for key in keys:
+            if key not in queued:
+                self.schedule(key, due_at)
+
+    def run(self, max_cycles=None):
+        """Process due keys until the queue is empty (or for `max_cycles` cycles). Returns the cycles run."""
+        cycles = 0
+        while self.queue and (max_cycles is None or cycles < max_cycles):
+            now = time.time()
+            due = self.due(now)
+            if due:
+                cycles += 1
+                try:
+                    self.process(due)
+                except Exception as e:
+                    self._retry_later(due, e)
+                else:
+                    self.failures = 0
+                continue
+
+            wait = min(self.queue[0][0] - now, self.idle_sleep)
+            time.sleep(max(wait, 0))
+        return cycles